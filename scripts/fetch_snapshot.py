@@ -1,5 +1,5 @@
 import argparse
-import time
+import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Callable, List
@@ -7,19 +7,74 @@ from typing import Callable, List
 import pandas as pd
 
 
-def retry_call(func: Callable, attempts: int = 3, delay: float = 1.0, backoff: float = 1.8):
+class AsyncRateLimiter:
+    """Space request starts at least ``period / max_rate`` seconds apart."""
+
+    def __init__(self, max_rate: float = 120, period: float = 60.0) -> None:
+        self.interval = period / max_rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def retry_call(
+    func: Callable,
+    limiter: AsyncRateLimiter,
+    attempts: int = 3,
+    delay: float = 1.0,
+    backoff: float = 1.8,
+):
     last_exc = None
     for attempt in range(attempts):
+        await limiter.acquire()
         try:
-            return func()
+            return await asyncio.to_thread(func)
         except Exception as exc:  # noqa: BLE001
             last_exc = exc
-            time.sleep(delay * (backoff ** attempt))
+            await asyncio.sleep(delay * (backoff ** attempt))
     raise last_exc
 
 
-def rate_limit_sleep(seconds: float = 0.4) -> None:
-    time.sleep(seconds)
+def gather_limited(func: Callable, items: List, concurrency: int = 8) -> List:
+    """Call blocking ``func(item)`` for every item with at most ``concurrency`` in flight.
+
+    Results keep the order of ``items``.
+    """
+
+    async def _run() -> List:
+        sem = asyncio.Semaphore(concurrency)
+        limiter = AsyncRateLimiter()
+
+        async def _one(item):
+            async with sem:
+                return await retry_call(lambda: func(item), limiter)
+
+        return await asyncio.gather(*[_one(item) for item in items])
+
+    return asyncio.run(_run())
+
+
+def _membership_frame(df: pd.DataFrame, concept: str) -> pd.DataFrame:
+    ticker_col = "代码" if "代码" in df.columns else "code"
+    name_col = "名称" if "名称" in df.columns else "name"
+    sub = pd.DataFrame(
+        {
+            "ticker": df[ticker_col].astype(str) if ticker_col in df.columns else "",
+            "name": df[name_col].astype(str) if name_col in df.columns else "",
+        },
+        index=df.index,
+    )
+    sub["concept"] = concept
+    sub["industry"] = concept
+    sub["description"] = ""
+    return sub
 
 
 def fetch_concepts_em(concept_names: List[str]) -> pd.DataFrame:
@@ -31,21 +86,13 @@ def fetch_concepts_em(concept_names: List[str]) -> pd.DataFrame:
     if missing:
         raise ValueError(f"Concepts not found on EM: {missing}")
 
-    rows = []
-    for name in concept_names:
-        df = retry_call(lambda: ak.stock_board_concept_cons_em(symbol=name))
-        rate_limit_sleep()
-        for _, row in df.iterrows():
-            rows.append(
-                {
-                    "ticker": str(row.get("代码", row.get("code", ""))),
-                    "name": str(row.get("名称", row.get("name", ""))),
-                    "concept": name,
-                    "industry": name,
-                    "description": "",
-                }
-            )
-    return pd.DataFrame(rows)
+    frames = gather_limited(
+        lambda name: ak.stock_board_concept_cons_em(symbol=name), concept_names
+    )
+    return pd.concat(
+        [_membership_frame(df, name) for name, df in zip(concept_names, frames)],
+        ignore_index=True,
+    )
 
 
 def fetch_concepts_ths(concept_names: List[str]) -> pd.DataFrame:
@@ -57,21 +104,13 @@ def fetch_concepts_ths(concept_names: List[str]) -> pd.DataFrame:
     if missing:
         raise ValueError(f"Concepts not found on THS: {missing}")
 
-    rows = []
-    for name in concept_names:
-        df = retry_call(lambda: ak.stock_board_concept_cons_ths(symbol=name))
-        rate_limit_sleep()
-        for _, row in df.iterrows():
-            rows.append(
-                {
-                    "ticker": str(row.get("代码", row.get("code", ""))),
-                    "name": str(row.get("名称", row.get("name", ""))),
-                    "concept": name,
-                    "industry": name,
-                    "description": "",
-                }
-            )
-    return pd.DataFrame(rows)
+    frames = gather_limited(
+        lambda name: ak.stock_board_concept_cons_ths(symbol=name), concept_names
+    )
+    return pd.concat(
+        [_membership_frame(df, name) for name, df in zip(concept_names, frames)],
+        ignore_index=True,
+    )
 
 
 def fetch_prices(tickers: List[str], as_of: datetime) -> pd.DataFrame:
@@ -81,19 +120,17 @@ def fetch_prices(tickers: List[str], as_of: datetime) -> pd.DataFrame:
     start_date = (as_of - timedelta(days=450)).strftime("%Y%m%d")
     end_date = as_of.strftime("%Y%m%d")
 
+    def _fetch(ticker: str) -> pd.DataFrame:
+        return ak.stock_zh_a_hist(
+            symbol=ticker,
+            period="daily",
+            start_date=start_date,
+            end_date=end_date,
+            adjust="",
+        )
+
     frames = []
-    for ticker in tickers:
-        def _fetch():
-            return ak.stock_zh_a_hist(
-                symbol=ticker,
-                period="daily",
-                start_date=start_date,
-                end_date=end_date,
-                adjust="",
-            )
-
-        df = retry_call(_fetch)
-        rate_limit_sleep()
+    for ticker, df in zip(tickers, gather_limited(_fetch, tickers)):
         if df.empty:
             continue
         df = df.rename(columns={"日期": "date", "收盘": "close", "成交量": "volume"})
@@ -108,6 +145,18 @@ def fetch_prices(tickers: List[str], as_of: datetime) -> pd.DataFrame:
     return prices
 
 
+def write_snapshot_table(df: pd.DataFrame, csv_path: Path) -> None:
+    """Write ``df`` as CSV plus, when pyarrow is available, a sibling Parquet copy.
+
+    Readers that prefer Parquet (the backtest specpacks) then skip the CSV parse.
+    """
+    df.to_csv(csv_path, index=False)
+    try:
+        df.to_parquet(csv_path.with_suffix(".parquet"), compression="zstd", index=False)
+    except ImportError:
+        csv_path.with_suffix(".parquet").unlink(missing_ok=True)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Fetch snapshot data for concept screening")
     parser.add_argument("--as-of", required=True, help="Snapshot date YYYY-MM-DD")
@@ -132,16 +181,18 @@ def main() -> None:
     if membership.empty:
         raise RuntimeError("No concept members fetched")
 
-    tickers = sorted(set(membership["ticker"].tolist()))
-    prices = fetch_prices(tickers, as_of)
+    tickers = pd.Index(membership["ticker"].unique()).sort_values()
+    prices = fetch_prices(tickers.tolist(), as_of)
     if prices.empty:
         raise RuntimeError("No prices fetched")
 
-    counts = prices.groupby("ticker").size()
+    prices["ticker"] = prices["ticker"].astype("category")
+    counts = prices.groupby("ticker", observed=True, sort=False).size()
     valid_tickers = counts[counts >= 121].index
-    dropped = sorted(set(tickers) - set(valid_tickers))
-    if dropped:
+    dropped = tickers.difference(valid_tickers)
+    if len(dropped):
         print(f"Dropping {len(dropped)} tickers with insufficient history (need >=121).")
+    membership["ticker"] = membership["ticker"].astype("category")
     membership = membership[membership["ticker"].isin(valid_tickers)]
     prices = prices[prices["ticker"].isin(valid_tickers)]
 
@@ -150,8 +201,8 @@ def main() -> None:
 
     snapshot_dir = Path("data/snapshots") / args.as_of
     snapshot_dir.mkdir(parents=True, exist_ok=True)
-    membership.to_csv(snapshot_dir / "concept_membership.csv", index=False)
-    prices.to_csv(snapshot_dir / "prices.csv", index=False)
+    write_snapshot_table(membership, snapshot_dir / "concept_membership.csv")
+    write_snapshot_table(prices, snapshot_dir / "prices.csv")
 
     print(f"Saved {len(membership)} membership rows and {len(prices)} price rows to {snapshot_dir}")
 
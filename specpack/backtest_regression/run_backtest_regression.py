@@ -1,62 +1,61 @@
 import json
-import math
 import shlex
-import subprocess
+import shutil
+import sys
 from pathlib import Path
+from typing import List
 
 import numpy as np
-import pandas as pd
 import yaml
 
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+from src.backtest import (  # noqa: E402
+    build_close_matrix,
+    compute_momentum60,
+    forward_return,
+    load_cached_report,
+    load_snapshot,
+    report_cache_key,
+    report_stamp,
+    run_screener,
+)
+from src.run import git_commit  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 N_DATES = 30
 HORIZONS = [1, 5, 20]
 TOP_N = 5
 MIN_ENHANCED_HISTORY = 80
 
 
-def load_snapshot(snapshot_as_of: str):
-    snapshot_dir = Path("data/snapshots") / snapshot_as_of
-    prices_path = snapshot_dir / "prices.csv"
-    membership_path = snapshot_dir / "concept_membership.csv"
-    if not prices_path.exists():
-        raise FileNotFoundError(f"Missing prices.csv: {prices_path}")
-    if not membership_path.exists():
-        raise FileNotFoundError(f"Missing concept_membership.csv: {membership_path}")
-    prices = pd.read_csv(prices_path)
-    prices["date"] = pd.to_datetime(prices["date"])
-    return prices
-
-
-def compute_momentum60(prices: pd.DataFrame, date: pd.Timestamp) -> pd.DataFrame:
-    df = prices[prices["date"] <= date].copy()
-    assert df["date"].max() <= date
-    df = df.sort_values(["ticker", "date"])
-    df["momentum_60"] = df.groupby("ticker")["close"].pct_change(59)
-    latest = df[df["date"] == date].copy()
-    latest = latest.dropna(subset=["momentum_60"])
-    return latest
-
-
-def weight_nonneg(values: pd.Series) -> pd.Series:
-    weights = values.clip(lower=0)
-    if weights.sum() <= 0:
-        return pd.Series([1 / len(values)] * len(values), index=values.index)
-    return weights / weights.sum()
-
-
-def forward_return(prices: pd.DataFrame, date: pd.Timestamp, tickers: list, horizon: int) -> float:
-    df = prices[prices["ticker"].isin(tickers)].copy()
-    df = df.sort_values(["ticker", "date"])
-    df["future_close"] = df.groupby("ticker")["close"].shift(-horizon)
-    current = df[df["date"] == date].copy()
-    if current.empty:
-        return 0.0
-    current = current.dropna(subset=["future_close"])
-    if current.empty:
-        return 0.0
-    assert (df[df["date"] > date]["date"].min() > date) if not df[df["date"] > date].empty else True
-    ret = (current["future_close"] - current["close"]) / current["close"]
-    return float(ret.mean())
+def strip_options(tokens: List[str], options: tuple) -> List[str]:
+    """Drop each of ``options`` and the value that follows it from ``tokens``."""
+    filtered = []
+    skip_next = False
+    for token in tokens:
+        if skip_next:
+            skip_next = False
+            continue
+        if token in options:
+            skip_next = True
+            continue
+        filtered.append(token)
+    return filtered
+
+
+def weight_nonneg(values) -> np.ndarray:
+    weights = np.maximum(np.asarray(values, dtype=np.float64), 0.0)
+    total = weights.sum()
+    if total <= 0:
+        return np.full_like(weights, 1.0 / weights.size)
+    return weights / total
 
 
 def main() -> None:
@@ -64,49 +63,36 @@ def main() -> None:
     cmd_template = conf["run"]["cmd"]
     snapshot_as_of = conf["run"]["as_of"]
 
-    prices = load_snapshot(snapshot_as_of)
-    all_dates = sorted(prices["date"].unique())
-    candidates = []
-    for idx, d in enumerate(all_dates):
-        if idx + 1 < MIN_ENHANCED_HISTORY:
-            continue
-        if idx + max(HORIZONS) >= len(all_dates):
-            continue
-        candidates.append(d)
+    matrix = build_close_matrix(load_snapshot(snapshot_as_of))
+    all_dates = list(matrix.date_idx)
+    # Dates with enough history behind them and every horizon ahead of them.
+    candidates = all_dates[MIN_ENHANCED_HISTORY - 1 : max(len(all_dates) - max(HORIZONS), 0)]
 
     selected_dates = []
+    reports_by_date = {}
     failures = []
+    commit = git_commit()
+    base_tokens = strip_options(shlex.split(cmd_template), ("--date", "--top", "--output-json"))
     for d in reversed(candidates):
         output_path = Path("outputs") / f"report_{d.strftime('%Y-%m-%d')}_top{TOP_N}.json"
+        # Sidecar must not match the report_*_top*.json globs used by tools/.
+        key_path = output_path.with_suffix(".cachekey")
+
+        filtered = base_tokens + ["--date", d.strftime("%Y-%m-%d"), "--top", str(TOP_N)]
+        cache_key = report_cache_key(filtered, commit, snapshot_as_of)
+        report = load_cached_report(output_path, key_path, cache_key, TOP_N)
+        if report is not None:
+            reports_by_date[d] = report
+            selected_dates.append(d)
+            if len(selected_dates) >= N_DATES:
+                break
+            continue
+
         if output_path.exists():
             output_path.unlink()
-        cache_dir = Path(".cache")
-        if cache_dir.exists():
-            subprocess.call("rm -rf .cache", shell=True)
-
-        tokens = shlex.split(cmd_template)
-        filtered = []
-        skip_next = False
-        for token in tokens:
-            if skip_next:
-                skip_next = False
-                continue
-            if token in ("--date", "--top", "--output-json"):
-                skip_next = True
-                continue
-            filtered.append(token)
-        filtered.extend(
-            [
-                "--date",
-                d.strftime("%Y-%m-%d"),
-                "--top",
-                str(TOP_N),
-            ]
-        )
-        cmd = " ".join(shlex.quote(tok) for tok in filtered)
-        ret = subprocess.call(cmd, shell=True)
-        if ret != 0:
-            raise SystemExit(ret)
+        key_path.unlink(missing_ok=True)
+        shutil.rmtree(".cache", ignore_errors=True)
+        run_screener(filtered)
         if not output_path.exists():
             failures.append(
                 {
@@ -118,7 +104,8 @@ def main() -> None:
                 }
             )
             continue
-        report = json.loads(output_path.read_text(encoding="utf-8"))
+        raw = output_path.read_bytes()
+        report = _json_loads(raw)
         if len(report.get("results", [])) < TOP_N:
             first = report.get("results", [{}])[0] if report.get("results") else {}
             failures.append(
@@ -131,6 +118,8 @@ def main() -> None:
                 }
             )
             continue
+        key_path.write_text(report_stamp(cache_key, raw), encoding="utf-8")
+        reports_by_date[d] = report
         selected_dates.append(d)
         if len(selected_dates) >= N_DATES:
             break
@@ -163,25 +152,23 @@ def main() -> None:
 
     results = []
     for d in selected_dates:
-        momentum = compute_momentum60(prices, d)
+        momentum = compute_momentum60(matrix, d)
         top = momentum.sort_values("momentum_60", ascending=False).head(TOP_N)
         baseline_tickers = top["ticker"].tolist()
-        baseline_weights = weight_nonneg(top["momentum_60"])
+        baseline_weights = weight_nonneg(top["momentum_60"].to_numpy())
 
-        output_path = Path("outputs") / f"report_{d.strftime('%Y-%m-%d')}_top{TOP_N}.json"
-        report = json.loads(output_path.read_text(encoding="utf-8"))
+        report = reports_by_date[d]
         enhanced_rows = report.get("results", [])
         enhanced_tickers = [row["ticker"] for row in enhanced_rows]
-        scores = pd.Series([row.get("final_score", 0.0) for row in enhanced_rows])
-        enhanced_weights = weight_nonneg(scores)
+        enhanced_weights = weight_nonneg([row.get("final_score", 0.0) for row in enhanced_rows])
 
         if len(baseline_tickers) != TOP_N or len(enhanced_tickers) != TOP_N:
             raise AssertionError("selection size invalid")
 
         horizons_data = {}
         for horizon in HORIZONS:
-            base_ret = forward_return(prices, d, baseline_tickers, horizon)
-            enh_ret = forward_return(prices, d, enhanced_tickers, horizon)
+            base_ret = forward_return(matrix, d, baseline_tickers, horizon)
+            enh_ret = forward_return(matrix, d, enhanced_tickers, horizon)
             horizons_data[str(horizon)] = {
                 "baseline_return": round(base_ret, 8),
                 "enhanced_return": round(enh_ret, 8),
@@ -1,58 +1,28 @@
 import json
 import math
-import subprocess
+import shlex
+import shutil
+import sys
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
 import yaml
 
-
-def load_snapshot(snapshot_as_of: str):
-    snapshot_dir = Path("data/snapshots") / snapshot_as_of
-    prices_path = snapshot_dir / "prices.csv"
-    membership_path = snapshot_dir / "concept_membership.csv"
-    if not prices_path.exists():
-        raise FileNotFoundError(f"Missing prices.csv: {prices_path}")
-    if not membership_path.exists():
-        raise FileNotFoundError(f"Missing concept_membership.csv: {membership_path}")
-    prices = pd.read_csv(prices_path)
-    prices["date"] = pd.to_datetime(prices["date"])
-    membership = pd.read_csv(membership_path)
-    return prices, membership
-
-
-def forward_return(prices: pd.DataFrame, date: pd.Timestamp, tickers: list) -> float:
-    if not tickers:
-        return 0.0
-    df = prices[prices["ticker"].isin(tickers)].copy()
-    df = df.sort_values(["ticker", "date"])
-    df["next_close"] = df.groupby("ticker")["close"].shift(-1)
-    current = df[df["date"] == date]
-    if current.empty:
-        return 0.0
-    current = current.dropna(subset=["next_close"])
-    if current.empty:
-        return 0.0
-    ret = (current["next_close"] - current["close"]) / current["close"]
-    return float(ret.mean())
-
-
-def compute_momentum60(prices: pd.DataFrame, date: pd.Timestamp) -> pd.DataFrame:
-    df = prices[prices["date"] <= date].copy()
-    # Ensure no future data used.
-    assert df["date"].max() <= date
-    df = df.sort_values(["ticker", "date"])
-    df["momentum_60"] = df.groupby("ticker")["close"].pct_change(59)
-    latest = df[df["date"] == date].copy()
-    latest = latest.dropna(subset=["momentum_60"])
-    return latest
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+from src.backtest import (  # noqa: E402
+    build_close_matrix,
+    compute_momentum60,
+    forward_return,
+    load_snapshot,
+    run_screener,
+)
 
 
 def summarize(series: list) -> dict:
     if not series:
         return {"mean": 0.0, "std": 0.0, "win_rate": 0.0}
-    arr = np.array(series, dtype=float)
+    arr = np.fromiter(series, dtype=np.float64, count=len(series))
     return {
         "mean": float(arr.mean()),
         "std": float(arr.std(ddof=0)),
@@ -65,18 +35,11 @@ def main():
     cmd_template = conf["run"]["cmd"]
     snapshot_as_of = conf["run"]["as_of"]
 
-    prices, membership = load_snapshot(snapshot_as_of)
-
-    all_dates = sorted(prices["date"].unique())
+    matrix = build_close_matrix(load_snapshot(snapshot_as_of))
+    all_dates = list(matrix.date_idx)
     min_enhanced_history = 121
     horizon = 5
-    candidates = []
-    for idx, d in enumerate(all_dates):
-        if idx + 1 < min_enhanced_history:
-            continue
-        if idx + horizon >= len(all_dates):
-            continue
-        candidates.append(d)
+    candidates = all_dates[min_enhanced_history - 1 : max(len(all_dates) - horizon, 0)]
     N = 10
     dates = candidates[-N:]
     if len(dates) < 5:
@@ -88,13 +51,14 @@ def main():
     enhanced_theme_scores = []
 
     for d in dates:
-        momentum = compute_momentum60(prices, d)
+        momentum = compute_momentum60(matrix, d)
         top = momentum.sort_values("momentum_60", ascending=False).head(5)
         baseline_tickers = top["ticker"].tolist()
-        baseline_ret = forward_return(prices, d, baseline_tickers)
+        baseline_ret = forward_return(matrix, d, baseline_tickers)
         # Ensure forward return uses future date.
-        if not prices[prices["date"] > d].empty:
-            assert prices[prices["date"] > d]["date"].min() > d
+        next_idx = matrix.date_idx[d] + 1
+        if next_idx < len(all_dates):
+            assert all_dates[next_idx] > d
 
         # Enhanced run
         cmd = cmd_template.replace("--date 2026-01-20", f"--date {d.strftime('%Y-%m-%d')}")
@@ -102,17 +66,13 @@ def main():
         output_path = Path("outputs") / f"report_{d.strftime('%Y-%m-%d')}_top5.json"
         if output_path.exists():
             output_path.unlink()
-        cache_dir = Path(".cache")
-        if cache_dir.exists():
-            subprocess.call("rm -rf .cache", shell=True)
-        ret = subprocess.call(cmd, shell=True)
-        if ret != 0:
-            raise SystemExit(ret)
+        shutil.rmtree(".cache", ignore_errors=True)
+        run_screener(shlex.split(cmd))
         if not output_path.exists():
             raise FileNotFoundError(f"Missing enhanced output: {output_path}")
         report = json.loads(output_path.read_text(encoding="utf-8"))
         enhanced_tickers = [row["ticker"] for row in report.get("results", [])]
-        enhanced_ret = forward_return(prices, d, enhanced_tickers)
+        enhanced_ret = forward_return(matrix, d, enhanced_tickers)
 
         for row in report.get("results", []):
             data_date = row.get("data_date")
@@ -1,33 +1,43 @@
+import numpy as np
 import pandas as pd
 
+KEY_COLUMNS = ["ticker", "concept"]
+
 
 def main() -> None:
     base_dir = "data/snapshots/2026-01-20"
-    membership = pd.read_csv(f"{base_dir}/concept_membership.csv")
-    prices = pd.read_csv(f"{base_dir}/prices.csv")
+    membership = pd.read_csv(
+        f"{base_dir}/concept_membership.csv",
+        dtype={"ticker": "string", "concept": "string"},
+    )
+    prices = pd.read_csv(f"{base_dir}/prices.csv", usecols=["ticker"], dtype={"ticker": "string"})
 
-    for col in ("ticker", "concept"):
+    for col in KEY_COLUMNS:
         if col not in membership.columns:
             raise AssertionError(f"missing column: {col}")
-        if membership[col].isna().any():
+
+    keys = membership[KEY_COLUMNS]
+    null_cols = keys.isna().any()
+    empty_cols = keys.apply(lambda s: s.str.strip().eq("")).any()
+    for col in KEY_COLUMNS:
+        if null_cols[col]:
             raise AssertionError(f"null values in {col}")
-        if (membership[col].astype(str).str.strip() == "").any():
+        if empty_cols[col]:
             raise AssertionError(f"empty values in {col}")
 
-    if membership.duplicated(subset=["ticker", "concept"]).any():
+    if membership.duplicated(subset=KEY_COLUMNS).any():
         raise AssertionError("duplicate (ticker, concept) in membership")
 
-    membership_tickers = set(membership["ticker"].astype(str).tolist())
-    prices_tickers = set(prices["ticker"].astype(str).tolist())
-    if not membership_tickers.issubset(prices_tickers):
+    membership_tickers = membership["ticker"].to_numpy(dtype=object)
+    prices_tickers = prices["ticker"].unique().to_numpy(dtype=object)
+    if np.setdiff1d(membership_tickers, prices_tickers).size:
         raise AssertionError("membership tickers not subset of prices tickers")
 
-    unique_concepts = membership["concept"].nunique()
-    if unique_concepts < 8:
+    concept_sizes = membership["concept"].value_counts(sort=False)
+    if len(concept_sizes) < 8:
         raise AssertionError("unique_concepts < 8")
 
-    min_concept_members = membership.groupby("concept").size().min()
-    if min_concept_members < 50:
+    if concept_sizes.min() < 50:
         raise AssertionError("min_concept_members < 50")
 
 
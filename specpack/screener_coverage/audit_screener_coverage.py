@@ -1,34 +1,51 @@
 import json
 import os
 import subprocess
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Tuple
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
-def _load_jsonl(path: Path) -> List[Dict[str, Any]]:
-    entries: List[Dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            row = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(row, dict):
-            entries.append(row)
-    return entries
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 
-def _git_rev(repo_root: Path) -> str:
-    return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=repo_root, text=True).strip()
+def _count_modes(path: Path) -> Tuple[Counter, str]:
+    """Count rows per ``mode`` and pick the first snapshot_id in one streaming pass."""
+    counts: Counter = Counter()
+    snapshot_id = ""
+    with path.open("rb") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                row = _json_loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(row, dict):
+                continue
+            counts[row.get("mode")] += 1
+            if not snapshot_id and row.get("snapshot_id"):
+                snapshot_id = str(row["snapshot_id"])
+    return counts, snapshot_id
 
 
-def _snapshot_id(entries: List[Dict[str, Any]]) -> str:
-    for row in entries:
-        snapshot = row.get("snapshot_id")
-        if snapshot:
-            return str(snapshot)
-    return ""
+def _git_rev(repo_root: Path) -> str:
+    git_dir = repo_root / ".git"
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        if not head.startswith("ref: "):
+            return head
+        ref_path = git_dir / head[len("ref: ") :]
+        if ref_path.is_file():
+            return ref_path.read_text(encoding="utf-8").strip()
+    except OSError:
+        pass
+    # Packed refs, worktrees (.git is a file) and other layouts go through git itself.
+    return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=repo_root, text=True).strip()
 
 
 def main() -> None:
@@ -40,11 +57,11 @@ def main() -> None:
     if not candidates_path.exists():
         raise FileNotFoundError(f"missing candidates: {candidates_path}")
 
-    entries = _load_jsonl(candidates_path)
-    total = len(entries)
-    enhanced_count = sum(1 for row in entries if row.get("mode") == "enhanced")
-    tech_only_count = sum(1 for row in entries if row.get("mode") == "tech_only")
-    all_mode_count = sum(1 for row in entries if row.get("mode") == "all")
+    mode_counts, snapshot_id = _count_modes(candidates_path)
+    total = sum(mode_counts.values())
+    enhanced_count = mode_counts["enhanced"]
+    tech_only_count = mode_counts["tech_only"]
+    all_mode_count = mode_counts["all"]
     derived_all_count = enhanced_count + tech_only_count
 
     print(
@@ -71,7 +88,7 @@ def main() -> None:
             "derived_all": derived_all_count,
         },
         "git_rev": _git_rev(repo_root),
-        "snapshot_id": _snapshot_id(entries),
+        "snapshot_id": snapshot_id,
         "source_path": str(candidates_path),
     }
     metrics_path = repo_root / "artifacts_metrics" / "screener_coverage_latest.json"
@@ -3,36 +3,64 @@ import math
 import os
 import re
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - libyaml not available
+    from yaml import SafeLoader as _YamlLoader
+
+CONCEPT_SPLIT_RE = re.compile(r"[,\uFF0C;\uFF1B、]")
+MEMBERSHIP_REQUIRED = frozenset({"ticker", "name", "concept", "industry", "description"})
+PRICES_REQUIRED = frozenset({"date", "ticker", "close", "volume"})
+
 
 def load_snapshot_membership(snapshot_dir: Path) -> pd.DataFrame:
     path = snapshot_dir / "concept_membership.csv"
-    if not path.exists():
-        raise FileNotFoundError(f"Missing membership file: {path}")
-    df = pd.read_csv(path)
-    required = {"ticker", "name", "concept", "industry", "description"}
-    missing = required - set(df.columns)
+    try:
+        df = pd.read_csv(path)
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Missing membership file: {path}") from exc
+    missing = MEMBERSHIP_REQUIRED.difference(df.columns)
     if missing:
         raise AssertionError(f"membership missing columns: {sorted(missing)}")
-    if df["ticker"].duplicated().any():
+    if not df["ticker"].is_unique:
         raise AssertionError("membership ticker is not unique")
     return df
 
 
 def load_snapshot_prices(snapshot_dir: Path) -> pd.DataFrame:
     path = snapshot_dir / "prices.csv"
-    if not path.exists():
-        raise FileNotFoundError(f"Missing prices file: {path}")
-    df = pd.read_csv(path)
-    required = {"date", "ticker", "close", "volume"}
-    missing = required - set(df.columns)
+    try:
+        header = pd.read_csv(path, nrows=0).columns
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Missing prices file: {path}") from exc
+    missing = PRICES_REQUIRED.difference(header)
     if missing:
         raise AssertionError(f"prices missing columns: {sorted(missing)}")
-    return df
+    # Only date and ticker are audited; skip parsing the numeric columns.
+    return pd.read_csv(
+        path,
+        usecols=["date", "ticker"],
+        dtype={"date": "string", "ticker": "category"},
+    )
+
+
+def _check_missing_values(records: list, label: str) -> None:
+    frame = pd.DataFrame.from_records(records)
+    if frame.empty or not frame.isna().to_numpy().any():
+        return
+    # Locate the offending key; NaN may also come from keys absent in some rows.
+    for record in records:
+        for key, value in record.items():
+            if value is None:
+                raise AssertionError(f"{label} {key} is None")
+            if isinstance(value, float) and math.isnan(value):
+                raise AssertionError(f"{label} {key} is NaN")
 
 
 def check_report_fields(report: dict) -> None:
@@ -41,25 +69,24 @@ def check_report_fields(report: dict) -> None:
         for field in ("theme_hits", "score_breakdown", "data_date"):
             if field not in row:
                 raise AssertionError(f"missing field: {field}")
-        indicators = row.get("indicators", {})
-        for key, value in indicators.items():
-            if value is None:
-                raise AssertionError(f"indicator {key} is None")
-            if isinstance(value, float) and math.isnan(value):
-                raise AssertionError(f"indicator {key} is NaN")
-        breakdown = row.get("score_breakdown", {})
-        for key, value in breakdown.items():
-            if value is None:
-                raise AssertionError(f"score_breakdown {key} is None")
-            if isinstance(value, float) and math.isnan(value):
-                raise AssertionError(f"score_breakdown {key} is NaN")
         themes = [hit.get("theme") for hit in row.get("theme_hits", []) if hit.get("theme")]
         if len(themes) != len(set(themes)):
             raise AssertionError("duplicate core theme in a single stock")
+    _check_missing_values([row.get("indicators", {}) for row in results], "indicator")
+    _check_missing_values([row.get("score_breakdown", {}) for row in results], "score_breakdown")
+
+
+@lru_cache(maxsize=None)
+def _load_yaml_cached(path: str, mtime_ns: int) -> dict:
+    return yaml.load(Path(path).read_text(encoding="utf-8"), Loader=_YamlLoader)
+
+
+def load_yaml(path: Path) -> dict:
+    return _load_yaml_cached(str(path), path.stat().st_mtime_ns)
 
 
 def load_signal_core_map() -> dict:
-    raw = yaml.safe_load(Path("signals.yaml").read_text(encoding="utf-8"))
+    raw = load_yaml(Path("signals.yaml"))
     mapping = {}
     for item in raw.get("signals", []):
         mapping[item["id"]] = item.get("core_theme", item.get("theme", ""))
@@ -67,7 +94,7 @@ def load_signal_core_map() -> dict:
 
 
 def load_signal_theme_core_map() -> dict:
-    raw = yaml.safe_load(Path("signals.yaml").read_text(encoding="utf-8"))
+    raw = load_yaml(Path("signals.yaml"))
     mapping = {}
     for item in raw.get("signals", []):
         theme = item.get("theme", "")
@@ -93,29 +120,26 @@ def _read_default_theme_map(repo_root: Path) -> str:
 
 def load_core_theme_concepts(signal_to_core: dict, theme_to_core: dict, map_path: Path) -> dict:
     df = pd.read_csv(map_path)
+    if "主题名称" in df.columns:
+        keys = df["主题名称"].fillna("").astype(str).str.strip().to_numpy()
+        key_to_core = theme_to_core
+    else:
+        keys = df["主题ID"].astype(str).to_numpy()
+        key_to_core = signal_to_core
+    concepts = df["对应行业/概念"].fillna("").astype(str).to_numpy()
     core_map = {}
-    for _, row in df.iterrows():
-        if "主题名称" in df.columns:
-            theme_name = str(row.get("主题名称", "")).strip()
-            core_theme = theme_to_core.get(theme_name)
-        else:
-            signal_id = str(row.get("主题ID"))
-            core_theme = signal_to_core.get(signal_id)
+    for key, raw in zip(keys, concepts):
+        core_theme = key_to_core.get(key)
         if not core_theme:
             continue
-        concepts = str(row.get("对应行业/概念", ""))
-        tokens = [
-            t.strip()
-            for t in concepts.replace("；", ";").replace("，", ",").replace("、", ",").split(",")
-            if t.strip()
-        ]
+        tokens = [t.strip() for t in CONCEPT_SPLIT_RE.split(raw) if t.strip()]
         core_map.setdefault(core_theme, set()).update(tokens)
     return core_map
 
 
 def main() -> None:
     repo_root = Path(__file__).resolve().parents[2]
-    conf = yaml.safe_load(Path("specpack/snapshot_replay/assertions.yaml").read_text(encoding="utf-8"))
+    conf = load_yaml(Path("specpack/snapshot_replay/assertions.yaml"))
     cmd = conf["run"]["cmd"]
     output_json = Path(conf["run"]["output_json"])
     as_of = conf["run"]["as_of"]
@@ -125,21 +149,21 @@ def main() -> None:
     if ret != 0:
         raise SystemExit(ret)
 
-    if not output_json.exists():
-        raise FileNotFoundError(f"missing report: {output_json}")
-
-    report = json.loads(output_json.read_text(encoding="utf-8"))
+    try:
+        report = json.loads(output_json.read_text(encoding="utf-8"))
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"missing report: {output_json}") from exc
     snapshot_dir = Path("data/snapshots") / as_of
     membership = load_snapshot_membership(snapshot_dir)
     prices = load_snapshot_prices(snapshot_dir)
 
-    counts = prices.groupby("ticker").size()
-    if (counts < 121).any():
+    min_count = prices["ticker"].value_counts(sort=False).min()
+    if min_count < 121:
         raise AssertionError("min_count < 121 in snapshot prices.csv")
 
     if prices["date"].max() > as_of:
         raise AssertionError("prices date exceeds as_of")
-    if as_of not in set(prices["date"].astype(str).tolist()):
+    if not (prices["date"].to_numpy() == as_of).any():
         raise AssertionError("prices missing as_of date")
 
     check_report_fields(report)
@@ -158,12 +182,18 @@ def main() -> None:
             if core_theme:
                 core_seen.add(core_theme)
 
+    # A concept may feed several core themes, so count matches over (concept, core) pairs.
+    pairs = pd.DataFrame(
+        [(concept, core) for core, concepts in core_to_concepts.items() for concept in concepts],
+        columns=["concept", "core_theme"],
+    )
+    pairs = pairs[pairs["concept"].isin(membership["concept"].unique())]
+    matched_by_core = pairs.groupby("core_theme")["concept"].nunique()
+
     for core_theme in core_seen:
-        concepts = core_to_concepts.get(core_theme, set())
-        if not concepts:
+        if not core_to_concepts.get(core_theme):
             raise AssertionError(f"no concepts found for core theme: {core_theme}")
-        matched = membership[membership["concept"].isin(concepts)]["concept"].nunique()
-        if matched < 2:
+        if matched_by_core.get(core_theme, 0) < 2:
             raise AssertionError(f"core theme {core_theme} concepts < 2")
 
     print("[snapshot_health] passed")
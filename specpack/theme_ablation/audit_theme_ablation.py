@@ -2,10 +2,24 @@ import json
 import os
 import re
 import shutil
-import subprocess
 import sys
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+from src.run import main as run_main  # noqa: E402
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+_SCORE_TOTALS = itemgetter("score_total", "score_tech_total", "score_theme_total")
 
 
 def _theme_weight_from_report(report: Dict[str, Any]) -> Optional[float]:
@@ -31,6 +45,14 @@ def _theme_scores(report: Dict[str, Any]) -> List[float]:
     return scores
 
 
+def _score_arrays(results: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (score_total, score_tech_total, score_theme_total) arrays for ``results``."""
+    scores = np.array(
+        [_SCORE_TOTALS(row["score_breakdown"]) for row in results], dtype=np.float64
+    ).reshape(-1, 3)
+    return scores[:, 0], scores[:, 1], scores[:, 2]
+
+
 def _read_default_theme_map(repo_root: Path) -> str:
     env_map = os.environ.get("THEME_MAP")
     if env_map:
@@ -53,23 +75,16 @@ def _debug_payload(report: Dict[str, Any], repo_root: Path, base_report: Path) -
     )
 
 
-def run_and_load(
-    cmd: List[str],
+def load_report(
     base_report: Path,
     copy_path: Path,
     repo_root: Path,
     expected_weight: float,
     label: str,
 ) -> Dict[str, Any]:
-    env = os.environ.copy()
-    env["PYTHONPATH"] = str(repo_root) + (
-        os.pathsep + env["PYTHONPATH"] if "PYTHONPATH" in env and env["PYTHONPATH"] else ""
-    )
-    shutil.rmtree(repo_root / ".cache", ignore_errors=True)
-    subprocess.check_call(cmd, cwd=repo_root, env=env)
     if not base_report.exists():
         raise FileNotFoundError(f"{label}: missing report: {base_report}")
-    report = json.loads(base_report.read_text(encoding="utf-8"))
+    report = _json_loads(base_report.read_bytes())
     results = report.get("results", [])
     if len(results) != 5:
         raise AssertionError(
@@ -91,13 +106,10 @@ def run_and_load(
 
 
 def main() -> None:
-    repo_root = Path(__file__).resolve().parents[2]
+    repo_root = REPO_ROOT
     date_str = "2026-01-20"
     theme_map = _read_default_theme_map(repo_root)
-    enhanced_cmd = [
-        sys.executable,
-        "-m",
-        "src.run",
+    enhanced_args = [
         "--date",
         date_str,
         "--top",
@@ -113,10 +125,7 @@ def main() -> None:
         "1",
         "--no-cache",
     ]
-    tech_only_cmd = [
-        sys.executable,
-        "-m",
-        "src.run",
+    tech_only_args = [
         "--date",
         date_str,
         "--top",
@@ -134,28 +143,40 @@ def main() -> None:
     ]
 
     outputs_dir = repo_root / "outputs"
+    # The enhanced run writes to its own output dir so the tech-only run cannot overwrite it.
+    enhanced_dir = outputs_dir / "ablation_enhanced"
+    enhanced_args += ["--output-dir", str(enhanced_dir)]
     base_report = outputs_dir / f"report_{date_str}_top5.json"
+    enhanced_base_report = enhanced_dir / base_report.name
     enhanced_copy = outputs_dir / f"report_{date_str}_top5_enhanced.json"
     tech_only_copy = outputs_dir / f"report_{date_str}_top5_techonly.json"
 
-    for path in (base_report, enhanced_copy, tech_only_copy):
+    for path in (base_report, enhanced_base_report, enhanced_copy, tech_only_copy):
         if path.exists():
             path.unlink()
 
-    enhanced_report = run_and_load(
-        enhanced_cmd,
-        base_report,
+    # Run the screens one after the other: both merge into the shared candidates JSONL.
+    # src.run always saves to .cache under a key that ignores theme_weight, so each run
+    # starts from an empty cache and none is left behind for later screens.
+    # src.run resolves signals, snapshots and outputs relative to the working directory.
+    prev_cwd = os.getcwd()
+    os.chdir(repo_root)
+    try:
+        for args in (enhanced_args, tech_only_args):
+            shutil.rmtree(repo_root / ".cache", ignore_errors=True)
+            run_main(args)
+    finally:
+        os.chdir(prev_cwd)
+    shutil.rmtree(repo_root / ".cache", ignore_errors=True)
+
+    enhanced_report = load_report(
+        enhanced_base_report,
         enhanced_copy,
         repo_root,
         expected_weight=1.0,
         label="enhanced",
     )
-
-    if base_report.exists():
-        base_report.unlink()
-
-    tech_report = run_and_load(
-        tech_only_cmd,
+    tech_report = load_report(
         base_report,
         tech_only_copy,
         repo_root,
@@ -163,9 +184,6 @@ def main() -> None:
         label="tech_only",
     )
 
-    enhanced_report = json.loads(enhanced_copy.read_text(encoding="utf-8"))
-    tech_report = json.loads(tech_only_copy.read_text(encoding="utf-8"))
-
     enhanced_results = enhanced_report.get("results", [])
     tech_results = tech_report.get("results", [])
     if len(enhanced_results) != 5:
@@ -173,70 +191,57 @@ def main() -> None:
     if len(tech_results) != 5:
         raise AssertionError("tech_only results_len != 5")
 
-    for report in (enhanced_report, tech_report):
+    for report, report_path in (
+        (enhanced_report, enhanced_base_report),
+        (tech_report, base_report),
+    ):
         for row in report.get("results", []):
             breakdown = row.get("score_breakdown")
             if breakdown is None:
                 raise AssertionError(
-                    f"missing score_breakdown; {_debug_payload(report, repo_root, base_report)}"
+                    f"missing score_breakdown; {_debug_payload(report, repo_root, report_path)}"
                 )
             if "score_total" not in breakdown:
                 raise AssertionError(
-                    f"missing score_total; {_debug_payload(report, repo_root, base_report)}"
+                    f"missing score_total; {_debug_payload(report, repo_root, report_path)}"
                 )
             if "score_tech_total" not in breakdown:
                 raise AssertionError(
-                    f"missing score_tech_total; {_debug_payload(report, repo_root, base_report)}"
+                    f"missing score_tech_total; {_debug_payload(report, repo_root, report_path)}"
                 )
             if "score_theme_total" not in breakdown:
                 raise AssertionError(
-                    f"missing score_theme_total; {_debug_payload(report, repo_root, base_report)}"
+                    f"missing score_theme_total; {_debug_payload(report, repo_root, report_path)}"
                 )
 
-    for row in tech_results:
-        breakdown = row.get("score_breakdown")
-        score_theme_total = float(breakdown["score_theme_total"])
-        if abs(score_theme_total) > 1e-9:
-            raise AssertionError(
-                "tech_only score_theme_total not zero; "
-                f"{_debug_payload(tech_report, repo_root, base_report)}"
-            )
+    tech_total, _, tech_theme = _score_arrays(tech_results)
+    if (np.abs(tech_theme) > 1e-9).any():
+        raise AssertionError(
+            "tech_only score_theme_total not zero; "
+            f"{_debug_payload(tech_report, repo_root, base_report)}"
+        )
 
-    enhanced_theme_scores = [
-        float(row["score_breakdown"]["score_theme_total"]) for row in enhanced_results
-    ]
-    if not any(value > 0 for value in enhanced_theme_scores):
+    enh_total, enh_tech, enh_theme = _score_arrays(enhanced_results)
+    if not (enh_theme > 0).any():
         raise AssertionError(
             "enhanced has no positive theme score; "
-            f"{_debug_payload(enhanced_report, repo_root, base_report)}"
+            f"{_debug_payload(enhanced_report, repo_root, enhanced_base_report)}"
+        )
+    if (np.round(enh_total, 8) != np.round(enh_tech + enh_theme, 8)).any():
+        raise AssertionError(
+            "enhanced score_total mismatch; "
+            f"{_debug_payload(enhanced_report, repo_root, enhanced_base_report)}"
         )
-
-    for row in enhanced_results:
-        breakdown = row["score_breakdown"]
-        score_total = float(breakdown["score_total"])
-        score_tech_total = float(breakdown["score_tech_total"])
-        score_theme_total = float(breakdown["score_theme_total"])
-        if round(score_total, 8) != round(score_tech_total + score_theme_total, 8):
-            raise AssertionError(
-                "enhanced score_total mismatch; "
-                f"{_debug_payload(enhanced_report, repo_root, base_report)}"
-            )
 
     enhanced_tickers = [row.get("ticker") for row in enhanced_results]
     tech_tickers = [row.get("ticker") for row in tech_results]
     if enhanced_tickers == tech_tickers:
-        for idx, row in enumerate(enhanced_results):
-            enh_breakdown = row["score_breakdown"]
-            tech_breakdown = tech_results[idx]["score_breakdown"]
-            enh_score_total = float(enh_breakdown["score_total"])
-            tech_score_total = float(tech_breakdown["score_total"])
-            enh_theme_total = float(enh_breakdown["score_theme_total"])
-            if round(enh_score_total - tech_score_total, 8) != round(enh_theme_total, 8):
-                raise AssertionError(
-                    "aligned score diff mismatch; "
-                    f"enhanced={_debug_payload(enhanced_report, repo_root, base_report)}; "
-                    f"tech_only={_debug_payload(tech_report, repo_root, base_report)}"
-                )
+        if (np.round(enh_total - tech_total, 8) != np.round(enh_theme, 8)).any():
+            raise AssertionError(
+                "aligned score diff mismatch; "
+                f"enhanced={_debug_payload(enhanced_report, repo_root, enhanced_base_report)}; "
+                f"tech_only={_debug_payload(tech_report, repo_root, base_report)}"
+            )
 
 
 if __name__ == "__main__":
@@ -1,38 +1,56 @@
 import json
+import shlex
+import sys
+from operator import itemgetter
 from pathlib import Path
-import subprocess
+from typing import List
 
+import numpy as np
 import pandas as pd
 
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+from src.run import main as run_main  # noqa: E402
+
+_SCORE_TOTALS = itemgetter("score_total", "score_tech_total", "score_theme_total")
+
 
 def main() -> None:
-    cmd = (
-        "python3 -m src.run --date 2026-01-20 --top 5 "
+    run_args = shlex.split(
+        "--date 2026-01-20 --top 5 "
         "--provider snapshot --no-fallback --snapshot-as-of 2026-01-20"
     )
-    ret = subprocess.call(cmd, shell=True)
-    if ret != 0:
-        raise SystemExit(ret)
+    run_main(run_args)
 
     report_path = Path("outputs/report_2026-01-20_top5.json")
-    if not report_path.exists():
-        raise FileNotFoundError(f"missing report: {report_path}")
-
-    report = json.loads(report_path.read_text(encoding="utf-8"))
+    try:
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"missing report: {report_path}") from exc
     results = report.get("results", [])
 
-    membership = pd.read_csv("data/snapshots/2026-01-20/concept_membership.csv")
-    membership_concepts = set(membership["concept"].astype(str).tolist())
+    concepts = pd.read_csv(
+        "data/snapshots/2026-01-20/concept_membership.csv",
+        usecols=["concept"],
+        dtype={"concept": str},
+    )["concept"]
+    membership_concepts = set(concepts.to_numpy(dtype=object))
 
     k = 8
+    totals: List[float] = []
+    tech_totals: List[float] = []
+    theme_totals: List[float] = []
     for row in results:
         reason = row.get("reason", {})
         if isinstance(reason, dict):
             reason_obj = reason
         else:
             reason_obj = row.get("reason_struct", {}) or {}
-        themes_used = reason_obj.get("themes_used", [])
-        themes_used = list(dict.fromkeys(themes_used))
+        # Only a handful of themes per row: a list scan beats hashing into a dict.
+        themes_used = []
+        for theme in reason_obj.get("themes_used", []):
+            if theme not in themes_used:
+                themes_used.append(theme)
         if not (3 <= len(themes_used) <= 5):
             raise AssertionError("themes_used count out of range")
 
@@ -41,11 +59,10 @@ def main() -> None:
             if key not in breakdown:
                 raise AssertionError(f"missing score_breakdown.{key}")
 
-        score_total = float(breakdown["score_total"])
-        score_tech_total = float(breakdown["score_tech_total"])
-        score_theme_total = float(breakdown["score_theme_total"])
-        if round(score_total, k) != round(score_tech_total + score_theme_total, k):
-            raise AssertionError("score_total mismatch")
+        score_total, score_tech_total, score_theme_total = map(float, _SCORE_TOTALS(breakdown))
+        totals.append(score_total)
+        tech_totals.append(score_tech_total)
+        theme_totals.append(score_theme_total)
 
         if score_theme_total > 0:
             concept_hits = reason_obj.get("concept_hits", [])
@@ -56,6 +73,10 @@ def main() -> None:
                 if concept not in membership_concepts:
                     raise AssertionError("concept not in membership")
 
+    summed = np.add(tech_totals, theme_totals)
+    if (np.round(totals, k) != np.round(summed, k)).any():
+        raise AssertionError("score_total mismatch")
+
 
 if __name__ == "__main__":
     main()
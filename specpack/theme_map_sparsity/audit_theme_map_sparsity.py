@@ -2,47 +2,35 @@ import csv
 import hashlib
 import json
 import os
-import re
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
+import numpy as np
 
-TERM_SPLIT_RE = re.compile(r"[,\uFF0C;\uFF1B、|\s]+")
+
+# Punctuation separators are mapped to spaces, then str.split() breaks on any whitespace.
+TERM_SEPARATORS = str.maketrans(dict.fromkeys(",\uFF0C;\uFF1B、|", " "))
 
 
 def _split_terms(value: str) -> List[str]:
-    return [item.strip() for item in TERM_SPLIT_RE.split(str(value)) if item.strip()]
-
-
-def _percentile(values: List[int], q: float) -> float:
-    if not values:
-        return 0.0
-    if q <= 0:
-        return float(min(values))
-    if q >= 1:
-        return float(max(values))
-    ordered = sorted(values)
-    idx = (len(ordered) - 1) * q
-    lo = int(idx)
-    hi = min(lo + 1, len(ordered) - 1)
-    if lo == hi:
-        return float(ordered[lo])
-    frac = idx - lo
-    return ordered[lo] * (1 - frac) + ordered[hi] * frac
+    return str(value).translate(TERM_SEPARATORS).split()
 
 
 def _match_column(
     headers: List[str], exact_names: List[str], keywords: List[str]
 ) -> Optional[str]:
+    lowered: Dict[str, str] = {}
+    for header in headers:
+        lowered.setdefault(header.strip().lower(), header)
     for name in exact_names:
-        for header in headers:
-            if header.strip().lower() == name.lower():
-                return header
+        hit = lowered.get(name.lower())
+        if hit is not None:
+            return hit
     for header in headers:
-        lowered = header.lower()
-        for key in keywords:
-            if key in lowered or key in header:
-                return header
+        header_low = header.lower()
+        if any(key in header_low or key in header for key in keywords):
+            return header
     return None
 
 
@@ -55,39 +43,48 @@ def _resolve_theme_map(repo_root: Path) -> Path:
 
 
 def _read_theme_map(path: Path) -> Tuple[Dict[str, Set[str]], int]:
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        if not reader.fieldnames:
+    with path.open("r", encoding="utf-8", newline="", buffering=1 << 20) as handle:
+        reader = csv.reader(handle)
+        fieldnames = next(reader, None)
+        if not fieldnames:
             raise ValueError("theme map has no header row")
-        headers = [field.strip().lstrip("\ufeff") for field in reader.fieldnames]
-        reader.fieldnames = headers
+        headers = [field.strip().lstrip("\ufeff") for field in fieldnames]
         theme_col = _match_column(headers, ["theme", "主题名称"], ["theme", "主题"])
         concept_col = _match_column(headers, ["concept", "概念", "对应行业/概念"], ["concept", "概念"])
         if concept_col is None:
             concept_col = _match_column(headers, ["industry", "行业"], ["industry", "行业"])
         if theme_col is None or concept_col is None:
             raise ValueError(f"missing required columns: headers={headers}")
+        theme_idx = headers.index(theme_col)
+        concept_idx = headers.index(concept_col)
 
-        theme_terms: Dict[str, Set[str]] = {}
+        theme_term_lists: Dict[str, List[str]] = defaultdict(list)
         rows = 0
         for row in reader:
+            if not row:
+                continue
             rows += 1
-            theme = str(row.get(theme_col, "")).strip()
+            width = len(row)
+            theme = row[theme_idx].strip() if theme_idx < width else ""
             if not theme:
                 continue
-            raw_term = str(row.get(concept_col, "") or "").strip()
+            raw_term = row[concept_idx].strip() if concept_idx < width else ""
             if not raw_term or raw_term.lower() == "nan":
                 continue
-            for term in _split_terms(raw_term):
-                if not term:
-                    continue
-                theme_terms.setdefault(theme, set()).add(term)
+            theme_term_lists[theme].extend(_split_terms(raw_term))
 
+    theme_terms = {theme: set(terms) for theme, terms in theme_term_lists.items() if terms}
     return theme_terms, rows
 
 
 def _sha256(path: Path) -> str:
-    return hashlib.sha256(path.read_bytes()).hexdigest()
+    with path.open("rb") as handle:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(handle, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: handle.read(1 << 18), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
 
 
 def main() -> None:
@@ -105,8 +102,8 @@ def main() -> None:
     if concepts_per_theme:
         min_val = min(concepts_per_theme)
         max_val = max(concepts_per_theme)
-        p50 = _percentile(concepts_per_theme, 0.5)
-        p95 = _percentile(concepts_per_theme, 0.95)
+        counts = np.asarray(concepts_per_theme, dtype=np.int64)
+        p50, p95 = (float(q) for q in np.quantile(counts, [0.5, 0.95]))
     else:
         min_val = 0
         max_val = 0
@@ -1,79 +1,83 @@
+import copy
+import heapq
 import json
-import math
 import os
 import shutil
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+# Shared read-only default for missing mappings; never mutate it.
+_EMPTY_DICT: Dict[str, Any] = {}
+
+
+@lru_cache(maxsize=8)
+def _load_json_cached(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    return json.loads(Path(path_str).read_bytes())
+
 
 def _load_json(path: Path) -> Dict[str, Any]:
-    if not path.exists():
-        raise FileNotFoundError(f"missing metrics: {path}")
-    return json.loads(path.read_text(encoding="utf-8"))
+    # Cached per (path, mtime). Callers get their own copy, since main() backfills derived
+    # fields (N, unique_value_ratio) in place.
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"missing metrics: {path}") from exc
+    return copy.deepcopy(_load_json_cached(str(path), mtime_ns))
 
 
-def _percentile(values: List[float], q: float) -> Optional[float]:
+def _percentile(values: List[float], qs: List[float]) -> List[Optional[float]]:
     if not values:
-        return None
-    if q <= 0:
-        return min(values)
-    if q >= 1:
-        return max(values)
-    ordered = sorted(values)
-    idx = (len(ordered) - 1) * q
-    lo = math.floor(idx)
-    hi = math.ceil(idx)
-    if lo == hi:
-        return ordered[int(idx)]
-    frac = idx - lo
-    return ordered[lo] * (1 - frac) + ordered[hi] * frac
-
-
-def _extract_reports(metrics: Dict[str, Any], category: str) -> List[Dict[str, Any]]:
-    reports = metrics.get("reports", [])
-    if not isinstance(reports, list):
-        return []
-    return [r for r in reports if r.get("category") == category]
+        return [None] * len(qs)
+    # numpy's default (linear) interpolation matches the previous hand-rolled version.
+    result = np.percentile(np.asarray(values, dtype=np.float64), [q * 100 for q in qs])
+    return [float(value) for value in result]
 
 
-def _unique_themes(reports: List[Dict[str, Any]]) -> List[str]:
-    themes = []
-    for report in reports:
-        themes_used = report.get("themes_used", {})
-        if isinstance(themes_used, dict):
-            for theme in themes_used.get("unique", []) or []:
-                theme_str = str(theme)
-                if theme_str and theme_str not in themes:
-                    themes.append(theme_str)
-    return themes
+def _percentile_summary(values: List[float]) -> Dict[str, Optional[float]]:
+    p50, p95, p99 = _percentile(values, [0.5, 0.95, 0.99])
+    return {"p50": p50, "p95": p95, "p99": p99}
 
 
-def _theme_totals(reports: List[Dict[str, Any]]) -> List[float]:
-    avgs = []
+def _bucket_reports(metrics: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    buckets: Dict[str, List[Dict[str, Any]]] = {"enhanced": [], "tech_only": [], "all": []}
+    reports = metrics.get("reports", [])
+    if not isinstance(reports, list):
+        return buckets
     for report in reports:
-        totals = report.get("theme_total", {})
-        if isinstance(totals, dict) and totals.get("count", 0) > 0:
-            avgs.append(float(totals.get("avg", 0.0)))
-    return avgs
+        buckets.setdefault(report.get("category"), []).append(report)
+    return buckets
 
 
-def _positive_counts(reports: List[Dict[str, Any]]) -> Tuple[int, int]:
+def _aggregate_reports(reports: List[Dict[str, Any]]) -> Tuple[List[float], int, int, int]:
+    """Return (theme_total averages, positive count, result count, unique theme count)."""
+    avgs = []
     positive = 0
     total = 0
+    themes = set()
     for report in reports:
-        totals = report.get("theme_total", {})
+        themes_used = report.get("themes_used", _EMPTY_DICT)
+        if isinstance(themes_used, dict):
+            themes.update(str(theme) for theme in themes_used.get("unique", []) or [])
+        totals = report.get("theme_total", _EMPTY_DICT)
         if not isinstance(totals, dict):
             continue
+        count = totals.get("count", 0)
         positive += int(totals.get("positive", 0))
-        total += int(totals.get("count", 0))
-    return positive, total
+        total += int(count)
+        if count > 0:
+            avgs.append(float(totals.get("avg", 0.0)))
+    themes.discard("")
+    return avgs, positive, total, len(themes)
 
 
 def _techonly_violations(reports: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     violations = []
     for report in reports:
-        totals = report.get("theme_total", {})
+        totals = report.get("theme_total", _EMPTY_DICT)
         if not isinstance(totals, dict):
             continue
         max_val = totals.get("max")
@@ -86,21 +90,21 @@ def _techonly_violations(reports: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return violations
 
 
+def _offender(report: Dict[str, Any]) -> Dict[str, Any]:
+    totals = report.get("theme_total", _EMPTY_DICT)
+    avg_val = float(totals.get("avg", 0.0)) if isinstance(totals, dict) else 0.0
+    return {
+        "path": report.get("path"),
+        "avg": avg_val,
+        "positive": totals.get("positive") if isinstance(totals, dict) else None,
+        "count": totals.get("count") if isinstance(totals, dict) else None,
+    }
+
+
 def _top_offenders(reports: List[Dict[str, Any]], limit: int = 3) -> List[Dict[str, Any]]:
-    offenders = []
-    for report in reports:
-        totals = report.get("theme_total", {})
-        avg_val = float(totals.get("avg", 0.0)) if isinstance(totals, dict) else 0.0
-        offenders.append(
-            {
-                "path": report.get("path"),
-                "avg": avg_val,
-                "positive": totals.get("positive") if isinstance(totals, dict) else None,
-                "count": totals.get("count") if isinstance(totals, dict) else None,
-            }
-        )
-    offenders.sort(key=lambda x: (x["avg"], x["path"] or ""))
-    return offenders[:limit]
+    return heapq.nsmallest(
+        limit, map(_offender, reports), key=lambda x: (x["avg"], x["path"] or "")
+    )
 
 
 def _load_config(path: Path) -> Dict[str, float]:
@@ -119,7 +123,7 @@ def _load_config(path: Path) -> Dict[str, float]:
             "min_theme_total_unique_value_ratio_enhanced": 0.02,
             "min_theme_total_unique_value_ratio_all": 0.02,
         }
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw = json.loads(path.read_bytes())
     return {
         "delta_p50": float(raw.get("delta_p50", 0)),
         "delta_p95": float(raw.get("delta_p95", 0)),
@@ -143,7 +147,7 @@ def _load_config(path: Path) -> Dict[str, float]:
 
 
 def _result_bucket(metrics: Dict[str, Any], category: str) -> Dict[str, Any]:
-    result_level = metrics.get("result_level", {})
+    result_level = metrics.get("result_level", _EMPTY_DICT)
     if not isinstance(result_level, dict):
         return {}
     bucket = result_level.get(category, {})
@@ -233,9 +237,10 @@ def main() -> None:
     latest = _load_json(latest_path)
     config = _load_config(config_path)
 
-    enhanced_base = _extract_reports(baseline, "enhanced")
-    enhanced_latest = _extract_reports(latest, "enhanced")
-    tech_latest = _extract_reports(latest, "tech_only")
+    latest_reports = _bucket_reports(latest)
+    enhanced_base = _bucket_reports(baseline)["enhanced"]
+    enhanced_latest = latest_reports["enhanced"]
+    tech_latest = latest_reports["tech_only"]
     result_summary = _summarize_result_level(latest)
     enhanced_result = _result_bucket(latest, "enhanced")
     tech_result = _result_bucket(latest, "tech_only")
@@ -255,30 +260,21 @@ def main() -> None:
     if tech_violations:
         raise AssertionError(f"tech_only score_theme_total not zero: {tech_violations}")
 
-    base_positive, _ = _positive_counts(enhanced_base)
-    latest_positive, _ = _positive_counts(enhanced_latest)
+    base_values, base_positive, _, base_unique = _aggregate_reports(enhanced_base)
+    latest_values, latest_positive, _, latest_unique = _aggregate_reports(enhanced_latest)
     if base_positive > 0 and latest_positive < base_positive * 0.9:
         raise AssertionError(
             f"enhanced positive count dropped: {latest_positive} < {base_positive} * 0.9"
         )
 
-    base_values = _theme_totals(enhanced_base)
-    latest_values = _theme_totals(enhanced_latest)
-    base_unique = len(_unique_themes(enhanced_base))
-    latest_unique = len(_unique_themes(enhanced_latest))
-
     metrics_base = {
         "N": len(base_values),
-        "p50": _percentile(base_values, 0.5),
-        "p95": _percentile(base_values, 0.95),
-        "p99": _percentile(base_values, 0.99),
+        **_percentile_summary(base_values),
         "unique_count": base_unique,
     }
     metrics_latest = {
         "N": len(latest_values),
-        "p50": _percentile(latest_values, 0.5),
-        "p95": _percentile(latest_values, 0.95),
-        "p99": _percentile(latest_values, 0.99),
+        **_percentile_summary(latest_values),
         "unique_count": latest_unique,
     }
 
@@ -307,20 +303,23 @@ def main() -> None:
         )
 
     all_bucket = _result_bucket(latest, "all")
-    for bucket in (enhanced_result, tech_result, all_bucket):
-        theme_total_stats = _result_metric(bucket, "theme_total")
-        if isinstance(bucket, dict) and isinstance(theme_total_stats, dict) and "N" in theme_total_stats:
+    enhanced_theme_total = _result_metric(enhanced_result, "theme_total")
+    tech_theme_total = _result_metric(tech_result, "theme_total")
+    all_theme_total = _result_metric(all_bucket, "theme_total")
+    for bucket, theme_total_stats in (
+        (enhanced_result, enhanced_theme_total),
+        (tech_result, tech_theme_total),
+        (all_bucket, all_theme_total),
+    ):
+        if "N" in theme_total_stats:
             bucket["N"] = theme_total_stats.get("N")
-    enhanced_unique_ratio = _ensure_theme_total_ratio(_result_metric(enhanced_result, "theme_total"))
-    _ensure_theme_total_ratio(_result_metric(tech_result, "theme_total"))
-    all_unique_ratio = _ensure_theme_total_ratio(_result_metric(all_bucket, "theme_total"))
+    enhanced_unique_ratio = _ensure_theme_total_ratio(enhanced_theme_total)
+    _ensure_theme_total_ratio(tech_theme_total)
+    all_unique_ratio = _ensure_theme_total_ratio(all_theme_total)
     result_summary = _summarize_result_level(latest)
 
     non_deg_failures = []
-    enhanced_theme_total = _result_metric(enhanced_result, "theme_total")
-    enhanced_themes_used = _result_metric(enhanced_result, "themes_used")
     enhanced_concept_hits = _result_metric(enhanced_result, "concept_hits")
-    tech_theme_total = _result_metric(tech_result, "theme_total")
 
     concept_hits_unique_set = _stat_value(enhanced_concept_hits, "unique_set_count")
     if concept_hits_unique_set is not None and concept_hits_unique_set < config[
@@ -357,7 +356,6 @@ def main() -> None:
     elif theme_hit_unique_set < config["min_theme_hit_unique_set_enhanced"]:
         non_deg_failures.append("theme_total unique_set_count below minimum")
 
-    all_theme_total = _result_metric(all_bucket, "theme_total")
     all_n = _stat_value(all_bucket, "N")
     if all_n is None or all_n <= 0:
         pass
@@ -371,7 +369,7 @@ def main() -> None:
     elif theme_hit_unique_set_all < config["min_theme_hit_unique_set_all"]:
         non_deg_failures.append("theme_total unique_set_count (all) below minimum")
 
-    all_concept_hits = _result_metric(_result_bucket(latest, "all"), "concept_hits")
+    all_concept_hits = _result_metric(all_bucket, "concept_hits")
     concept_hits_unique_set_all = _stat_value(all_concept_hits, "unique_set_count")
     if concept_hits_unique_set_all is None:
         non_deg_failures.append("concept_hits unique_set_count (all) missing")
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import read_csv_cached
+from .run import build_parser, main as run_main, read_text_hash
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+PRICES_DTYPE = {"ticker": "category", "close": "float64", "volume": "int64"}
+
+
+@dataclass
+class CloseMatrix:
+    """Snapshot closes as a date x ticker array, with lookups from labels to positions.
+
+    Shifts are taken per ticker, over the rows that ticker actually has, as the old
+    groupby("ticker") code did. ``rank[i, j]`` is the row number of date ``i`` within
+    ticker ``j`` and ``packed[k, j]`` is that ticker's ``k``-th close.
+    """
+
+    close: np.ndarray
+    date_idx: Dict[pd.Timestamp, int]
+    tickers: np.ndarray
+    ticker_col: Dict[str, int]
+    present: np.ndarray
+    rank: np.ndarray
+    packed: np.ndarray
+    counts: np.ndarray
+
+
+def load_snapshot(snapshot_as_of: str) -> pd.DataFrame:
+    snapshot_dir = Path("data/snapshots") / snapshot_as_of
+    prices_path = snapshot_dir / "prices.csv"
+    membership_path = snapshot_dir / "concept_membership.csv"
+    if not prices_path.exists():
+        raise FileNotFoundError(f"Missing prices.csv: {prices_path}")
+    if not membership_path.exists():
+        raise FileNotFoundError(f"Missing concept_membership.csv: {membership_path}")
+    return read_csv_cached(
+        prices_path, usecols=list(PRICES_DTYPE) + ["date"], dtype=PRICES_DTYPE, parse_dates=["date"]
+    )
+
+
+def build_close_matrix(prices: pd.DataFrame) -> CloseMatrix:
+    duplicated = prices.duplicated(["date", "ticker"])
+    if duplicated.any():
+        first = prices.loc[duplicated, ["date", "ticker"]].iloc[0]
+        raise ValueError(
+            f"prices has {int(duplicated.sum())} duplicate (date, ticker) rows, "
+            f"e.g. {first['date']:%Y-%m-%d} {first['ticker']}"
+        )
+    # pivot already returns dates and tickers in sorted order.
+    wide = prices.pivot(index="date", columns="ticker", values="close")
+    tickers = wide.columns.to_numpy()
+    close = wide.to_numpy(dtype=np.float64)
+    # A ticker missing a date has no row there, unlike a row whose close is NaN.
+    present = np.zeros(close.shape, dtype=bool)
+    date_pos = wide.index.get_indexer(prices["date"])
+    present[date_pos, wide.columns.get_indexer(prices["ticker"])] = True
+    order = np.argsort(~present, axis=0, kind="stable")
+    return CloseMatrix(
+        close=close,
+        date_idx={d: i for i, d in enumerate(wide.index)},
+        tickers=tickers,
+        ticker_col={t: j for j, t in enumerate(tickers)},
+        present=present,
+        rank=np.cumsum(present, axis=0) - 1,
+        packed=np.take_along_axis(close, order, axis=0),
+        counts=present.sum(axis=0),
+    )
+
+
+def compute_momentum60(matrix: CloseMatrix, date: pd.Timestamp) -> pd.DataFrame:
+    i = matrix.date_idx[date]
+    # Only rows up to and including `date` are read; no future data used.
+    rows = matrix.rank[i]
+    cols = np.flatnonzero(matrix.present[i] & (rows >= 59))
+    mom = matrix.packed[rows[cols], cols] / matrix.packed[rows[cols] - 59, cols] - 1.0
+    mask = np.isfinite(mom)
+    return pd.DataFrame({"ticker": matrix.tickers[cols[mask]], "momentum_60": mom[mask]})
+
+
+def forward_return(
+    matrix: CloseMatrix, date: pd.Timestamp, tickers: list, horizon: int = 1
+) -> float:
+    ticker_col = matrix.ticker_col
+    cols = np.fromiter((ticker_col[t] for t in tickers if t in ticker_col), dtype=np.int64)
+    i = matrix.date_idx.get(date)
+    if cols.size == 0 or i is None:
+        return 0.0
+    cols = cols[matrix.present[i, cols]]
+    fut_rows = matrix.rank[i, cols] + horizon
+    ahead = fut_rows < matrix.counts[cols]
+    cols, fut_rows = cols[ahead], fut_rows[ahead]
+    cur = matrix.close[i, cols]
+    fut = matrix.packed[fut_rows, cols]
+    mask = np.isfinite(cur) & np.isfinite(fut)
+    if not mask.any():
+        return 0.0
+    return float(((fut[mask] - cur[mask]) / cur[mask]).mean())
+
+
+def run_screener(cmd_tokens: List[str]) -> None:
+    """Run a ``python -m src.run ...`` command in-process; anything else via subprocess."""
+    if "src.run" in cmd_tokens:
+        run_main(cmd_tokens[cmd_tokens.index("src.run") + 1 :])
+        return
+    ret = subprocess.call(cmd_tokens)
+    if ret != 0:
+        raise SystemExit(ret)
+
+
+def _run_argv(cmd_tokens: List[str]) -> List[str]:
+    if "src.run" in cmd_tokens:
+        return cmd_tokens[cmd_tokens.index("src.run") + 1 :]
+    return cmd_tokens
+
+
+def report_cache_key(cmd_tokens: List[str], commit: str, snapshot_as_of: str) -> str:
+    """Key a screener report on everything that feeds it.
+
+    That is the src.run arguments, the commit, the contents of the signals and theme-map
+    files (src.run's own defaults when not given), the src/*.py sources, so uncommitted
+    edits count too, and the snapshot files' size and mtime.
+    """
+    args, _ = build_parser().parse_known_args(_run_argv(cmd_tokens))
+    parts = [*cmd_tokens, commit, read_text_hash(args.signals), read_text_hash(args.theme_map)]
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        parts.append(f"{path.name}:{hashlib.sha256(path.read_bytes()).hexdigest()}")
+    for path in sorted((Path("data/snapshots") / snapshot_as_of).glob("*")):
+        stat = path.stat()
+        parts.append(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def report_stamp(cache_key: str, raw: bytes) -> str:
+    """Sidecar content for a report; the digest keeps a report rewritten elsewhere from
+    being reused."""
+    return f"{cache_key} {hashlib.sha256(raw).hexdigest()}"
+
+
+def load_cached_report(
+    output_path: Path, key_path: Path, cache_key: str, min_results: int
+) -> Optional[dict]:
+    """Return the report at ``output_path`` when its ``key_path`` sidecar matches
+    ``cache_key`` and the report bytes, and it holds ``min_results`` results; else None."""
+    if not output_path.exists() or not key_path.exists():
+        return None
+    raw = output_path.read_bytes()
+    if key_path.read_text(encoding="utf-8").strip() != report_stamp(cache_key, raw):
+        return None
+    report = _json_loads(raw)
+    if len(report.get("results", [])) < min_results:
+        return None
+    return report
@@ -1,4 +1,6 @@
+import hashlib
 import json
+import os
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
@@ -10,7 +12,7 @@ CACHE_DIR = Path(".cache")
 
 def cache_paths(cache_key: str) -> Tuple[Path, Path, Path]:
     CACHE_DIR.mkdir(exist_ok=True)
-    data_path = CACHE_DIR / f"features_{cache_key}.csv"
+    data_path = CACHE_DIR / f"features_{cache_key}.parquet"
     report_path = CACHE_DIR / f"report_{cache_key}.json"
     meta_path = CACHE_DIR / f"meta_{cache_key}.json"
     return data_path, report_path, meta_path
@@ -18,8 +20,11 @@ def cache_paths(cache_key: str) -> Tuple[Path, Path, Path]:
 
 def load_cached(cache_key: str) -> Tuple[Optional[pd.DataFrame], Optional[Dict]]:
     data_path, report_path, _ = cache_paths(cache_key)
+    csv_path = data_path.with_suffix(".csv")
     if data_path.exists():
-        df = pd.read_csv(data_path, parse_dates=["date"])
+        df = pd.read_parquet(data_path)
+    elif csv_path.exists():
+        df = pd.read_csv(csv_path, parse_dates=["date"])
     else:
         df = None
     if report_path.exists():
@@ -30,10 +35,59 @@ def load_cached(cache_key: str) -> Tuple[Optional[pd.DataFrame], Optional[Dict]]
     return df, report
 
 
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+
+def _save_features(df: pd.DataFrame, data_path: Path) -> None:
+    """Store features as Parquet; fall back to CSV without pyarrow or for unsupported dtypes."""
+    csv_path = data_path.with_suffix(".csv")
+    tmp = _tmp_path(data_path)
+    try:
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+    except (ImportError, TypeError, ValueError):
+        tmp.unlink(missing_ok=True)
+        stale, data_path = data_path, csv_path
+        df.to_csv(tmp, index=False)
+    else:
+        stale = csv_path
+    os.replace(tmp, data_path)
+    stale.unlink(missing_ok=True)
+
+
 def save_cached(cache_key: str, df: pd.DataFrame, report: Dict, meta: Dict) -> None:
+    # Write to per-process temp files and rename, so concurrent runs never leave a torn file.
     data_path, report_path, meta_path = cache_paths(cache_key)
-    df.to_csv(data_path, index=False)
-    with report_path.open("w", encoding="utf-8") as f:
-        json.dump(report, f, ensure_ascii=False, indent=2)
-    with meta_path.open("w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
+    _save_features(df, data_path)
+    for path, payload in ((report_path, report), (meta_path, meta)):
+        tmp = _tmp_path(path)
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+def read_csv_cached(csv_path: Path, **read_csv_kwargs) -> pd.DataFrame:
+    """Read ``csv_path`` via a Parquet copy under CACHE_DIR when one exists.
+
+    The copy is keyed on the CSV path, size, mtime and the read_csv arguments, so a changed
+    file or a different parse never reuses it. Parquet support is optional.
+    """
+    stat = csv_path.stat()
+    key_parts = [str(csv_path.resolve()), str(stat.st_size), str(stat.st_mtime_ns)]
+    key_parts.append(repr(sorted(read_csv_kwargs.items())))
+    key = hashlib.sha256("\0".join(key_parts).encode("utf-8")).hexdigest()[:32]
+    parquet_path = CACHE_DIR / f"csv_{csv_path.stem}_{key}.parquet"
+    if parquet_path.exists():
+        try:
+            return pd.read_parquet(parquet_path)
+        except ImportError:
+            pass
+    df = pd.read_csv(csv_path, **read_csv_kwargs)
+    tmp = _tmp_path(parquet_path)
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        df.to_parquet(tmp, compression="zstd", index=False)
+        os.replace(tmp, parquet_path)
+    except (ImportError, OSError):
+        tmp.unlink(missing_ok=True)
+    return df
@@ -1,10 +1,31 @@
+import heapq
 import json
+import os
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Dict, List
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _dumps(entry: Dict[str, Any]) -> bytes:
+    # Always stdlib json, so the file's bytes do not depend on whether orjson is installed.
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Shared read-only default for missing mappings; never mutate it.
+_EMPTY_DICT: Dict[str, Any] = {}
+
 
 def _candidate_entry(row: Dict[str, Any], mode: str, snapshot_id: str) -> Dict[str, Any]:
-    reason_struct = row.get("reason_struct", {}) if isinstance(row.get("reason_struct"), dict) else {}
+    reason_struct = row.get("reason_struct", _EMPTY_DICT)
+    if not isinstance(reason_struct, dict):
+        reason_struct = _EMPTY_DICT
     return {
         "item_id": row.get("ticker", ""),
         "ticker": row.get("ticker", ""),
@@ -22,25 +43,47 @@ def load_candidates(path: Path) -> List[Dict[str, Any]]:
     entries: List[Dict[str, Any]] = []
     if not path.exists():
         return entries
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            entry = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(entry, dict):
-            entries.append(entry)
+    with path.open("rb") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = _json_loads(line)
+            except ValueError:
+                # orjson rejects the NaN/Infinity tokens older json.dumps output may contain.
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Also covers UnicodeDecodeError from a torn or non-UTF-8 line.
+                    continue
+            if isinstance(entry, dict):
+                entries.append(entry)
     return entries
 
 
 def write_candidates_entries(entries: List[Dict[str, Any]], output_path: Path) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    if entries:
-        content = "\n".join(json.dumps(entry, ensure_ascii=False) for entry in entries) + "\n"
-    else:
-        content = ""
-    output_path.write_text(content, encoding="utf-8")
+    # Write a per-process temp file and rename, so readers never see a torn file.
+    tmp = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as handle:
+        for entry in entries:
+            handle.write(_dumps(entry))
+            handle.write(b"\n")
+    os.replace(tmp, output_path)
+
+
+_MODE_ORDER = {"enhanced": 0, "tech_only": 1, "all": 2}
+
+
+def _candidate_sort_key(entry: Dict[str, Any]) -> tuple:
+    mode_value = _MODE_ORDER.get(entry.get("mode"), 9)
+    try:
+        score_value = float(entry.get("final_score"))
+    except (TypeError, ValueError):
+        score_value = float("-inf")
+    item_id = str(entry.get("item_id") or entry.get("ticker") or "")
+    return (mode_value, -score_value, item_id)
 
 
 def write_candidates(report: Dict[str, Any], mode: str, output_path: Path, snapshot_id: str) -> None:
@@ -51,20 +94,19 @@ def write_candidates(report: Dict[str, Any], mode: str, output_path: Path, snaps
     new_entries = [_candidate_entry(row, mode, snapshot_id) for row in results]
     existing_entries = load_candidates(output_path)
 
-    merged = [entry for entry in existing_entries if entry.get("mode") != mode]
-    merged.extend(new_entries)
-
-    mode_order = {"enhanced": 0, "tech_only": 1, "all": 2}
-
-    def sort_key(entry: Dict[str, Any]) -> tuple:
-        mode_value = mode_order.get(entry.get("mode"), 9)
-        score = entry.get("final_score")
-        try:
-            score_value = float(score)
-        except (TypeError, ValueError):
-            score_value = float("-inf")
-        item_id = str(entry.get("item_id") or entry.get("ticker") or "")
-        return (mode_value, -score_value, item_id)
+    retained = [entry for entry in existing_entries if entry.get("mode") != mode]
 
-    merged = sorted(merged, key=sort_key)
+    # Decorate once so each entry's key is computed a single time.
+    by_key = itemgetter(0)
+    new_decorated = sorted(
+        ((_candidate_sort_key(entry), entry) for entry in new_entries), key=by_key
+    )
+    retained_decorated = [(_candidate_sort_key(entry), entry) for entry in retained]
+    # Retained entries are normally already ordered by a previous write, so only the new
+    # mode needs sorting before a linear merge. Files written elsewhere get a full sort.
+    if any(
+        prev[0] > cur[0] for prev, cur in zip(retained_decorated, retained_decorated[1:])
+    ):
+        retained_decorated.sort(key=by_key)
+    merged = [entry for _, entry in heapq.merge(retained_decorated, new_decorated, key=by_key)]
     write_candidates_entries(merged, output_path)
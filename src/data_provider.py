@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-import getpass
+import hashlib
 import os
-import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -20,7 +21,22 @@ def normalize_ticker(x) -> str:
     return s.zfill(6) if s.isdigit() else s
 
 
+def _normalize_tickers(values: pd.Series) -> pd.Series:
+    """Vectorised normalize_ticker; missing values are spelled as str() spells them."""
+    s = values.astype(str)
+    missing = values.isna()
+    if missing.any():
+        # Newer pandas keeps these missing through astype(str); old code gave "nan"/"None".
+        s = s.mask(missing, values[missing].map(str))
+    s = s.str.strip()
+    return s.where(~s.str.isdigit(), s.str.zfill(6))
+
+
 def _io_debug_exit(path: Path, exc: Exception) -> None:
+    # Only reached on I/O failure, so keep these imports off the normal startup path.
+    import getpass
+    import subprocess
+
     print(
         "[io] error={error} path={path}".format(error=type(exc).__name__, path=path),
         file=sys.stderr,
@@ -50,6 +66,45 @@ class StockInfo:
     description: str
 
 
+def _read_prices_csv(path: Path) -> pd.DataFrame:
+    """Parse prices.csv with pyarrow's CSV reader when available, keeping tickers as text."""
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:  # pragma: no cover - optional dependency
+        return pd.read_csv(path, dtype={"ticker": str})
+    options = pa_csv.ConvertOptions(
+        column_types={"ticker": pa.string(), "date": pa.string()},
+        strings_can_be_null=True,
+    )
+    return pa_csv.read_csv(str(path), convert_options=options).to_pandas()
+
+
+def _column_strings(df: pd.DataFrame, columns: Iterable[str]) -> Optional[List[str]]:
+    for column in columns:
+        if column in df.columns:
+            return [str(value) for value in df[column].tolist()]
+    return None
+
+
+def _board_stocks(df: pd.DataFrame, board: str) -> List[StockInfo]:
+    tickers = _column_strings(df, ("代码", "code")) or [""] * len(df)
+    names = _column_strings(df, ("名称", "name")) or tickers
+    return [
+        StockInfo(ticker=ticker, name=name, industry=board, concept=board, description="")
+        for ticker, name in zip(tickers, names)
+    ]
+
+
+def _spot_stocks(spot: pd.DataFrame) -> List[StockInfo]:
+    tickers = _column_strings(spot, ("代码",)) or [""] * len(spot)
+    names = _column_strings(spot, ("名称",)) or [""] * len(spot)
+    return [
+        StockInfo(ticker=ticker, name=name, industry="", concept="", description="")
+        for ticker, name in zip(tickers, names)
+    ]
+
+
 class DataProvider:
     name = "base"
 
@@ -95,27 +150,34 @@ class LocalMockProvider(DataProvider):
         seed: int,
     ) -> pd.DataFrame:
         dates = trading_calendar(end_date, lookback_days)
-        records = []
-        for idx, stock in enumerate(stocks):
-            rng = np.random.RandomState(seed + idx)
-            base_price = 10 + rng.rand() * 50
+        stocks = list(stocks)
+        if not stocks:
+            return pd.DataFrame()
+        closes = []
+        volumes = []
+        for idx in range(len(stocks)):
+            rng = np.random.default_rng(seed + idx)
+            base_price = 10 + rng.random() * 50
             daily_returns = rng.normal(loc=0.0005, scale=0.02, size=len(dates))
-            prices = base_price * (1 + daily_returns).cumprod()
-            volume = rng.randint(1_000_000, 50_000_000, size=len(dates))
-            for d, p, v in zip(dates, prices, volume):
-                records.append(
-                    {
-                        "date": d,
-                        "ticker": stock.ticker,
-                        "name": stock.name,
-                        "industry": stock.industry,
-                        "concept": stock.concept,
-                        "description": stock.description,
-                        "close": float(round(p, 4)),
-                        "volume": int(v),
-                    }
-                )
-        return pd.DataFrame.from_records(records)
+            closes.append(np.round(base_price * (1 + daily_returns).cumprod(), 4))
+            volumes.append(rng.integers(1_000_000, 50_000_000, size=len(dates)))
+
+        def _per_stock(attr: str) -> np.ndarray:
+            values = np.array([getattr(stock, attr) for stock in stocks], dtype=object)
+            return np.repeat(values, len(dates))
+
+        return pd.DataFrame(
+            {
+                "date": np.tile(dates.to_numpy(), len(stocks)),
+                "ticker": _per_stock("ticker"),
+                "name": _per_stock("name"),
+                "industry": _per_stock("industry"),
+                "concept": _per_stock("concept"),
+                "description": _per_stock("description"),
+                "close": np.concatenate(closes),
+                "volume": np.concatenate(volumes).astype(np.int64),
+            }
+        )
 
 
 class AkshareProvider(DataProvider):
@@ -127,15 +189,28 @@ class AkshareProvider(DataProvider):
         rate_limit: float = 0.4,
         retries: int = 3,
         backoff: float = 1.8,
+        max_workers: int = 8,
     ) -> None:
         self.cache_dir = Path(cache_dir)
         self.rate_limit = rate_limit
         self.retries = retries
         self.backoff = backoff
+        self.max_workers = max_workers
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
 
     def _sleep(self) -> None:
         time.sleep(self.rate_limit)
 
+    def _throttle(self) -> None:
+        """Space request starts rate_limit seconds apart across worker threads."""
+        with self._throttle_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self.rate_limit
+        if start_at > now:
+            time.sleep(start_at - now)
+
     def _retry(self, func: Callable):
         last_exc = None
         for attempt in range(self.retries):
@@ -146,10 +221,27 @@ class AkshareProvider(DataProvider):
                 time.sleep(self.rate_limit * (self.backoff**attempt))
         raise last_exc
 
-    def _cache_path(self, ticker: str, as_of: pd.Timestamp) -> Path:
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        key = stable_hash([ticker, as_of.strftime("%Y-%m-%d")])
-        return self.cache_dir / f"{ticker}_{key}.csv"
+    def _cache_path(self, ticker: str, as_of_str: str) -> Path:
+        key = hashlib.blake2b(f"{ticker}{as_of_str}".encode("utf-8"), digest_size=8).hexdigest()
+        return self.cache_dir / f"{ticker}_{key}.parquet"
+
+    @staticmethod
+    def _read_cached(cache_path: Path) -> Optional[pd.DataFrame]:
+        csv_path = cache_path.with_suffix(".csv")
+        if cache_path.exists():
+            return pd.read_parquet(cache_path)
+        if csv_path.exists():
+            return pd.read_csv(csv_path, parse_dates=["date"])
+        return None
+
+    @staticmethod
+    def _write_cached(df: pd.DataFrame, cache_path: Path) -> None:
+        """Cache history as Parquet so dtypes survive; fall back to CSV without pyarrow."""
+        try:
+            df.to_parquet(cache_path, engine="pyarrow", index=False)
+        except (ImportError, TypeError, ValueError):
+            cache_path.unlink(missing_ok=True)
+            df.to_csv(cache_path.with_suffix(".csv"), index=False)
 
     def get_stock_universe(self, industries: List[str]) -> List[StockInfo]:
         try:
@@ -158,19 +250,7 @@ class AkshareProvider(DataProvider):
             raise RuntimeError("akshare not available") from exc
 
         if not industries:
-            spot = ak.stock_zh_a_spot_em()
-            universe = []
-            for _, row in spot.iterrows():
-                universe.append(
-                    StockInfo(
-                        ticker=str(row.get("代码", "")),
-                        name=str(row.get("名称", "")),
-                        industry="",
-                        concept="",
-                        description="",
-                    )
-                )
-            return universe
+            return _spot_stocks(ak.stock_zh_a_spot_em())
 
         concept_names = ak.stock_board_concept_name_em()
         industry_names = ak.stock_board_industry_name_em()
@@ -182,27 +262,13 @@ class AkshareProvider(DataProvider):
             if name in concept_set:
                 df = self._retry(lambda: ak.stock_board_concept_cons_em(symbol=name))
                 self._sleep()
-                for _, row in df.iterrows():
-                    ticker = str(row.get("代码", row.get("code", "")))
-                    universe_map[ticker] = StockInfo(
-                        ticker=ticker,
-                        name=str(row.get("名称", row.get("name", ticker))),
-                        industry=name,
-                        concept=name,
-                        description="",
-                    )
+                for stock in _board_stocks(df, name):
+                    universe_map[stock.ticker] = stock
             elif name in industry_set:
                 df = self._retry(lambda: ak.stock_board_industry_cons_em(symbol=name))
                 self._sleep()
-                for _, row in df.iterrows():
-                    ticker = str(row.get("代码", row.get("code", "")))
-                    universe_map[ticker] = StockInfo(
-                        ticker=ticker,
-                        name=str(row.get("名称", row.get("name", ticker))),
-                        industry=name,
-                        concept=name,
-                        description="",
-                    )
+                for stock in _board_stocks(df, name):
+                    universe_map[stock.ticker] = stock
 
         if universe_map:
             return list(universe_map.values())
@@ -216,18 +282,7 @@ class AkshareProvider(DataProvider):
             spot = spot[mask]
         if spot.empty:
             spot = ak.stock_zh_a_spot_em().head(200)
-        universe = []
-        for _, row in spot.iterrows():
-            universe.append(
-                StockInfo(
-                    ticker=str(row.get("代码", "")),
-                    name=str(row.get("名称", "")),
-                    industry="",
-                    concept="",
-                    description="",
-                )
-            )
-        return universe
+        return _spot_stocks(spot)
 
     def get_price_history(
         self,
@@ -241,18 +296,19 @@ class AkshareProvider(DataProvider):
         except Exception as exc:  # pragma: no cover - optional dependency
             raise RuntimeError("akshare not available") from exc
 
-        records = []
         stock_lookup = {stock.ticker: stock for stock in stocks}
         start_date = (end_date - pd.Timedelta(days=lookback_days * 2)).strftime("%Y%m%d")
         end_date_str = end_date.strftime("%Y%m%d")
+        cache_date = end_date.strftime("%Y-%m-%d")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        for ticker, stock in stock_lookup.items():
-            cache_path = self._cache_path(ticker, end_date)
-            if cache_path.exists():
-                df = pd.read_csv(cache_path)
-                df["date"] = pd.to_datetime(df["date"])
-            else:
+        def _history(item: Tuple[str, StockInfo]) -> Optional[pd.DataFrame]:
+            ticker, stock = item
+            cache_path = self._cache_path(ticker, cache_date)
+            df = self._read_cached(cache_path)
+            if df is None:
                 def _fetch():
+                    self._throttle()
                     return ak.stock_zh_a_hist(
                         symbol=ticker,
                         period="daily",
@@ -262,9 +318,8 @@ class AkshareProvider(DataProvider):
                     )
 
                 df = self._retry(_fetch)
-                self._sleep()
                 if df.empty:
-                    continue
+                    return None
                 df = df.rename(
                     columns={
                         "日期": "date",
@@ -277,20 +332,24 @@ class AkshareProvider(DataProvider):
                 )
                 df = df[["date", "open", "close", "high", "low", "volume"]]
                 df["date"] = pd.to_datetime(df["date"])
-                df.to_csv(cache_path, index=False)
+                self._write_cached(df, cache_path)
 
             df = df[df["date"] <= end_date].sort_values("date")
             if len(df) < lookback_days:
-                continue
+                return None
             df = df.tail(lookback_days)
-            df = df.assign(
+            return df.assign(
                 ticker=ticker,
                 name=stock.name,
                 industry=stock.industry,
                 concept=stock.concept,
                 description=stock.description,
             )
-            records.append(df)
+
+        # Fetches are network-bound; overlap them while _throttle keeps the request rate.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            histories = list(executor.map(_history, stock_lookup.items()))
+        records = [df for df in histories if df is not None]
 
         if not records:
             return pd.DataFrame(
@@ -324,6 +383,8 @@ class SnapshotProvider(DataProvider):
         self.as_of = as_of
         self.snapshot_as_of = snapshot_as_of
         self.base_dir = Path(base_dir)
+        self._membership_cache: Dict[str, pd.DataFrame] = {}
+        self._prices_cache: Dict[str, pd.DataFrame] = {}
 
     def _available_snapshots(self) -> List[str]:
         if not self.base_dir.exists():
@@ -334,6 +395,10 @@ class SnapshotProvider(DataProvider):
         return self.base_dir / as_of.strftime("%Y-%m-%d")
 
     def _load_membership(self, as_of: pd.Timestamp) -> pd.DataFrame:
+        cache_key = as_of.strftime("%Y-%m-%d")
+        cached = self._membership_cache.get(cache_key)
+        if cached is not None:
+            return cached
         snapshot_dir = self._snapshot_dir(as_of)
         membership_path = snapshot_dir / "concept_membership.csv"
         if not membership_path.exists():
@@ -355,13 +420,18 @@ class SnapshotProvider(DataProvider):
                 "membership missing join key column(s) ['ticker']; "
                 f"columns={list(df.columns)}"
             )
-        df["ticker"] = df["ticker"].map(normalize_ticker)
+        df["ticker"] = _normalize_tickers(df["ticker"])
         df["concept"] = df.get("concept", "").astype(str).str.strip()
         df["industry"] = df.get("industry", df["concept"]).astype(str).str.strip()
         df["description"] = df.get("description", "").astype(str).str.strip()
+        self._membership_cache[cache_key] = df
         return df
 
     def _load_prices(self, as_of: pd.Timestamp) -> pd.DataFrame:
+        cache_key = as_of.strftime("%Y-%m-%d")
+        cached = self._prices_cache.get(cache_key)
+        if cached is not None:
+            return cached
         snapshot_dir = self._snapshot_dir(as_of)
         path: Optional[Path] = None
         suffix = None
@@ -378,7 +448,7 @@ class SnapshotProvider(DataProvider):
             )
         try:
             if suffix == "csv":
-                df = pd.read_csv(path, dtype={"ticker": str})
+                df = _read_prices_csv(path)
             else:
                 df = pd.read_parquet(path)
         except (FileNotFoundError, PermissionError) as exc:
@@ -390,8 +460,11 @@ class SnapshotProvider(DataProvider):
                 "prices missing join key column(s) ['ticker']; "
                 f"columns={list(df.columns)}"
             )
-        df["ticker"] = df["ticker"].map(normalize_ticker)
+        df["ticker"] = _normalize_tickers(df["ticker"]).astype("category")
         df["date"] = pd.to_datetime(df["date"])
+        # Sort once here so get_price_history can filter without re-sorting.
+        df = df.sort_values(["ticker", "date"], kind="mergesort", ignore_index=True)
+        self._prices_cache[cache_key] = df
         return df
 
     def get_stock_universe(self, industries: List[str]) -> List[StockInfo]:
@@ -401,18 +474,24 @@ class SnapshotProvider(DataProvider):
         membership = self._load_membership(snapshot_date)
         if industries:
             membership = membership[membership["concept"].isin(industries)]
-        universe = []
-        for _, row in membership.iterrows():
-            universe.append(
-                StockInfo(
-                    ticker=str(row["ticker"]),
-                    name=str(row.get("name", row["ticker"])),
-                    industry=str(row.get("industry", row.get("concept", ""))),
-                    concept=str(row.get("concept", "")),
-                    description=str(row.get("description", "")),
-                )
+        tickers = _column_strings(membership, ("ticker",))
+        names = _column_strings(membership, ("name",)) or tickers
+        return [
+            StockInfo(
+                ticker=ticker,
+                name=name,
+                industry=industry,
+                concept=concept,
+                description=description,
             )
-        return universe
+            for ticker, name, industry, concept, description in zip(
+                tickers,
+                names,
+                _column_strings(membership, ("industry",)),
+                _column_strings(membership, ("concept",)),
+                _column_strings(membership, ("description",)),
+            )
+        ]
 
     def get_price_history(
         self,
@@ -425,16 +504,16 @@ class SnapshotProvider(DataProvider):
         prices = self._load_prices(snapshot_date)
         membership = self._load_membership(snapshot_date)
         tickers = {normalize_ticker(stock.ticker) for stock in stocks}
-        prices = prices[prices["ticker"].isin(tickers)]
-        prices = prices[prices["date"] <= end_date].sort_values(["ticker", "date"])
-        prices = prices.groupby("ticker").tail(lookback_days)
+        prices = prices[prices["ticker"].isin(tickers) & (prices["date"] <= end_date)]
+        by_ticker = prices.groupby("ticker", sort=False, observed=True)
+        prices = prices[by_ticker.cumcount(ascending=False).to_numpy() < lookback_days]
         merged = prices.merge(membership, on="ticker", how="left")
-        merged["name"] = merged.get("name", merged["ticker"])
-        merged["industry"] = merged.get("industry", merged.get("concept", ""))
-        merged["concept"] = merged.get("concept", merged["industry"])
-        merged["description"] = merged.get("description", "")
-        merged = merged[["date", "ticker", "name", "industry", "concept", "description", "close", "volume"]]
-        return merged
+        # _load_membership always fills concept/industry/description; only name is optional.
+        if "name" not in merged.columns:
+            merged["name"] = merged["ticker"]
+        return merged[
+            ["date", "ticker", "name", "industry", "concept", "description", "close", "volume"]
+        ]
 
 
 def build_provider(
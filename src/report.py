@@ -1,11 +1,55 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from .signals import Signal
 
+_FLOAT_COLUMNS = [
+    "final_score",
+    "theme_score",
+    "technical_score",
+    "momentum_20_rank",
+    "momentum_60_rank",
+    "volume_rank",
+    "momentum_20",
+    "momentum_60",
+    "volatility_20",
+    "avg_volume_20",
+]
+# Score contributions listed in why_in_top5: (sort name, label, top_df column).
+_CONTRIBUTIONS = (
+    ("theme", "theme", "theme_score"),
+    ("momentum_20", "tech_momentum_20", "tech_momentum_20"),
+    ("momentum_60", "tech_momentum_60", "tech_momentum_60"),
+    ("volume", "tech_volume", "tech_volume"),
+)
+_CONTRIBUTION_LABELS = [label for _, label, _ in _CONTRIBUTIONS]
+_CONTRIBUTION_COLUMNS = [column for _, _, column in _CONTRIBUTIONS]
+_CONTRIBUTION_NAME_RANKS = np.argsort(np.argsort([name for name, _, _ in _CONTRIBUTIONS]))
+_HIT_LIST_KEYS = ("match_paths", "matched_terms", "matched_source")
+_MERGED_LIST_KEYS = ("signal_ids", "signal_themes") + _HIT_LIST_KEYS
+
+
+@lru_cache(maxsize=8)
+def _load_fallback_themes(theme_map_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Ordered unique core themes from the theme map, cached on (path, mtime_ns)."""
+    try:
+        # Only the core-theme column is needed; a map without it raises and yields no fallback.
+        df = pd.read_csv(theme_map_path, usecols=["核心主题"])
+    except Exception:
+        return ()
+    fallback = []
+    for item in pd.unique(df["核心主题"].to_numpy(dtype=object)):
+        item = str(item).strip()
+        if item and item not in fallback:
+            fallback.append(item)
+    return tuple(fallback)
+
 
 def normalize_themes_used(base_themes: List[str], theme_map_path: str) -> List[str]:
     seen = []
@@ -13,19 +57,10 @@ def normalize_themes_used(base_themes: List[str], theme_map_path: str) -> List[s
         if theme and theme not in seen:
             seen.append(theme)
 
-    fallback = []
     try:
-        df = pd.read_csv(theme_map_path)
-        if "核心主题" in df.columns:
-            candidates = df["核心主题"].astype(str).tolist()
-        else:
-            candidates = []
-        for item in candidates:
-            item = str(item).strip()
-            if item and item not in fallback:
-                fallback.append(item)
-    except Exception:
-        fallback = []
+        fallback = _load_fallback_themes(theme_map_path, os.stat(theme_map_path).st_mtime_ns)
+    except OSError:
+        fallback = ()
 
     for theme in fallback:
         if len(seen) >= 3:
@@ -47,6 +82,62 @@ def normalize_themes_used(base_themes: List[str], theme_map_path: str) -> List[s
     return seen
 
 
+def _merge_hits(hits: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    """Combine a ticker's raw hits into one entry per core theme."""
+    merged_hits = {}
+    for hit in hits:
+        hit_get = hit.get
+        core_theme = hit["theme"]
+        signal_id = hit_get("signal_id")
+        signal_theme = hit_get("signal_theme")
+        entry = merged_hits.get(core_theme)
+        if entry is None:
+            entry = merged_hits[core_theme] = {
+                "signal_id": signal_id,
+                "signal_ids": [],
+                "signal_theme": signal_theme,
+                "signal_themes": [],
+                "theme": core_theme,
+                "weight": 0.0,
+                "match_paths": [],
+                "matched_terms": [],
+                "matched_source": [],
+            }
+        if signal_id:
+            entry["signal_ids"].append(signal_id)
+        if signal_theme:
+            entry["signal_themes"].append(signal_theme)
+        entry["weight"] += float(hit_get("weight", 0.0))
+        for key in _HIT_LIST_KEYS:
+            values = hit_get(key)
+            if values:
+                entry[key].extend(values)
+    for entry in merged_hits.values():
+        for key in _MERGED_LIST_KEYS:
+            entry[key] = sorted(set(entry[key]))
+    return list(merged_hits.values())
+
+
+def _format_column(df: pd.DataFrame, column: str, spec: str) -> pd.Series:
+    return df[column].map(spec.format).astype(object)
+
+
+def top_rows(df: pd.DataFrame, n: int, column: str) -> pd.DataFrame:
+    """The ``n`` rows with the highest ``column``; ties go to the lower ticker, so the pick
+    does not depend on row order."""
+    return df.sort_values([column, "ticker"], ascending=[False, True]).head(n)
+
+
+def merge_hit_map(
+    hit_map: Dict[str, List[Dict[str, object]]],
+) -> Dict[str, List[Dict[str, object]]]:
+    """Merge every ticker's hits once, for callers that build several reports from one map.
+
+    The merged entries are shared by every report built from them; treat them as read-only.
+    """
+    return {ticker: _merge_hits(hits) for ticker, hits in hit_map.items()}
+
+
 def build_report(
     scored_df: pd.DataFrame,
     signals: List[Signal],
@@ -56,48 +147,58 @@ def build_report(
     themes_used: Optional[List[str]] = None,
     provider: Optional[str] = None,
     snapshot_as_of: Optional[str] = None,
+    merged_hits: Optional[Dict[str, List[Dict[str, object]]]] = None,
 ) -> Dict:
-    top_df = scored_df.sort_values("final_score", ascending=False).head(top_n)
+    top_df = top_rows(scored_df, top_n, "final_score")
+    # Cast once so the row tuples below already hold plain Python floats.
+    top_df = top_df.astype(dict.fromkeys(_FLOAT_COLUMNS, "float64"))
+    top_df = top_df.assign(
+        tech_momentum_20=0.5 * top_df["momentum_20_rank"],
+        tech_momentum_60=0.3 * top_df["momentum_60_rank"],
+        tech_volume=0.2 * top_df["volume_rank"],
+        score_total=top_df["theme_score"] + top_df["technical_score"],
+    )
+    # Rank the four score contributions of every row at once: larger first, ties by name.
+    contribution_values = top_df[_CONTRIBUTION_COLUMNS].to_numpy(dtype=np.float64)
+    name_ranks = np.broadcast_to(_CONTRIBUTION_NAME_RANKS, contribution_values.shape)
+    contribution_order = np.lexsort((name_ranks, -contribution_values), axis=-1)[:, :3]
+    # Format the numeric reason fragments column-wise; the loop only picks them up.
+    score_reasons = (
+        "评分构成: 主题"
+        + _format_column(top_df, "theme_score", "{:.3f}")
+        + "+0.5*20日动量分位"
+        + _format_column(top_df, "momentum_20_rank", "{:.3f}")
+        + "+0.3*60日动量分位"
+        + _format_column(top_df, "momentum_60_rank", "{:.3f}")
+        + "+0.2*均量分位"
+        + _format_column(top_df, "volume_rank", "{:.3f}")
+        + "="
+        + _format_column(top_df, "final_score", "{:.3f}")
+    ).tolist()
+    indicator_reasons = (
+        "20日动量: "
+        + _format_column(top_df, "momentum_20", "{:.4f}")
+        + "; 60日动量: "
+        + _format_column(top_df, "momentum_60", "{:.4f}")
+        + "; 20日波动率: "
+        + _format_column(top_df, "volatility_20", "{:.4f}")
+        + "; 20日均量: "
+        + _format_column(top_df, "avg_volume_20", "{:.0f}")
+    ).tolist()
+    as_of_str = as_of.strftime("%Y-%m-%d")
+    provider_value = provider or "unknown"
+    snapshot_value = snapshot_as_of or "none"
+    hit_path_reason = f"命中路径: provider={provider_value};as_of={snapshot_value}"
     rows = []
-    for _, row in top_df.iterrows():
-        hits = hit_map.get(row["ticker"], [])
-        merged_hits = {}
-        for hit in hits:
-            core_theme = hit["theme"]
-            entry = merged_hits.setdefault(
-                core_theme,
-                {
-                    "signal_id": hit.get("signal_id"),
-                    "signal_ids": [],
-                    "signal_theme": hit.get("signal_theme"),
-                    "signal_themes": [],
-                    "theme": core_theme,
-                    "weight": 0.0,
-                    "match_paths": set(),
-                    "matched_terms": set(),
-                    "matched_source": set(),
-                },
-            )
-            if hit.get("signal_id"):
-                entry["signal_ids"].append(hit["signal_id"])
-            if hit.get("signal_theme"):
-                entry["signal_themes"].append(hit["signal_theme"])
-            entry["weight"] += float(hit.get("weight", 0.0))
-            entry["match_paths"].update(hit.get("match_paths", []))
-            entry["matched_terms"].update(hit.get("matched_terms", []))
-            entry["matched_source"].update(hit.get("matched_source", []))
-        hits = []
-        for entry in merged_hits.values():
-            entry["signal_ids"] = sorted(set(entry["signal_ids"]))
-            entry["signal_themes"] = sorted(set(entry["signal_themes"]))
-            entry["match_paths"] = sorted(entry["match_paths"])
-            entry["matched_terms"] = sorted(entry["matched_terms"])
-            entry["matched_source"] = sorted(entry["matched_source"])
-            hits.append(entry)
+    for idx, row in enumerate(top_df.itertuples(index=False)):
+        if merged_hits is not None:
+            hits = merged_hits.get(row.ticker, [])
+        else:
+            hits = _merge_hits(hit_map.get(row.ticker, []))
         tech_components = {
-            "momentum_20": float(0.5 * row["momentum_20_rank"]),
-            "momentum_60": float(0.3 * row["momentum_60_rank"]),
-            "volume": float(0.2 * row["volume_rank"]),
+            "momentum_20": row.tech_momentum_20,
+            "momentum_60": row.tech_momentum_60,
+            "volume": row.tech_volume,
         }
         theme_components = [
             {
@@ -110,31 +211,27 @@ def build_report(
             for hit in hits
         ]
 
-        score_theme_total = float(row["theme_score"])
-        score_tech_total = float(row["technical_score"])
-        score_total = score_theme_total + score_tech_total
+        score_theme_total = row.theme_score
+        score_tech_total = row.technical_score
+        score_total = row.score_total
 
         base_themes = themes_used or [hit["theme"] for hit in hits if hit.get("theme")]
         themes_used_list = normalize_themes_used(base_themes, "theme_to_industry.csv")
 
         concept_hits = []
-        if row.get("concept") or row.get("industry"):
+        if getattr(row, "concept", None) or getattr(row, "industry", None):
             concept_hits.append(
                 {
-                    "concept": row.get("concept") or "",
-                    "industry": row.get("industry") or "",
+                    "concept": getattr(row, "concept", None) or "",
+                    "industry": getattr(row, "industry", None) or "",
                     "evidence": "membership",
                 }
             )
 
-        contributions = [
-            ("theme", score_theme_total, f"theme:+{score_theme_total:.3f}"),
-            ("momentum_20", tech_components["momentum_20"], f"tech_momentum_20:+{tech_components['momentum_20']:.3f}"),
-            ("momentum_60", tech_components["momentum_60"], f"tech_momentum_60:+{tech_components['momentum_60']:.3f}"),
-            ("volume", tech_components["volume"], f"tech_volume:+{tech_components['volume']:.3f}"),
+        why_in_top5 = [
+            f"{_CONTRIBUTION_LABELS[k]}:+{contribution_values[idx, k]:.3f}"
+            for k in contribution_order[idx]
         ]
-        contributions.sort(key=lambda x: (-x[1], x[0]))
-        why_in_top5 = [item[2] for item in contributions[:3]]
 
         reason_struct = {
             "themes_used": themes_used_list,
@@ -145,49 +242,37 @@ def build_report(
         reason_parts = []
         themes_str = ", ".join(themes_used_list)
         reason_parts.append(f"命中主题: {themes_str}")
-        if row.get("indicator_missing"):
+        if getattr(row, "indicator_missing", None):
             reason_parts.append("指标缺失按0处理")
-        reason_parts.append(
-            "评分构成: "
-            f"主题{row['theme_score']:.3f}"
-            f"+0.5*20日动量分位{row['momentum_20_rank']:.3f}"
-            f"+0.3*60日动量分位{row['momentum_60_rank']:.3f}"
-            f"+0.2*均量分位{row['volume_rank']:.3f}"
-            f"={row['final_score']:.3f}"
-        )
-        reason_parts.append(f"20日动量: {row['momentum_20']:.4f}")
-        reason_parts.append(f"60日动量: {row['momentum_60']:.4f}")
-        reason_parts.append(f"20日波动率: {row['volatility_20']:.4f}")
-        reason_parts.append(f"20日均量: {row['avg_volume_20']:.0f}")
-        provider_value = provider or "unknown"
-        snapshot_value = snapshot_as_of or "none"
-        reason_parts.append(f"命中路径: provider={provider_value};as_of={snapshot_value}")
+        reason_parts.append(score_reasons[idx])
+        reason_parts.append(indicator_reasons[idx])
+        reason_parts.append(hit_path_reason)
         reason = "; ".join(reason_parts)
         rows.append(
             {
-                "ticker": row["ticker"],
-                "name": row["name"],
-                "industry": row["industry"],
-                "final_score": float(row["final_score"]),
+                "ticker": row.ticker,
+                "name": row.name,
+                "industry": row.industry,
+                "final_score": row.final_score,
                 "theme_hits": hits,
                 "score_breakdown": {
-                    "score_total": float(score_total),
-                    "score_tech_total": float(score_tech_total),
-                    "score_theme_total": float(score_theme_total),
+                    "score_total": score_total,
+                    "score_tech_total": score_tech_total,
+                    "score_theme_total": score_theme_total,
                     "tech_components": tech_components,
                     "theme_components": theme_components,
-                    "theme_score": float(row["theme_score"]),
-                    "momentum_20_rank": float(row["momentum_20_rank"]),
-                    "momentum_60_rank": float(row["momentum_60_rank"]),
-                    "volume_rank": float(row["volume_rank"]),
-                    "final_score": float(row["final_score"]),
+                    "theme_score": row.theme_score,
+                    "momentum_20_rank": row.momentum_20_rank,
+                    "momentum_60_rank": row.momentum_60_rank,
+                    "volume_rank": row.volume_rank,
+                    "final_score": row.final_score,
                 },
-                "data_date": as_of.strftime("%Y-%m-%d"),
+                "data_date": as_of_str,
                 "indicators": {
-                    "momentum_20": float(row["momentum_20"]),
-                    "momentum_60": float(row["momentum_60"]),
-                    "volatility_20": float(row["volatility_20"]),
-                    "avg_volume_20": float(row["avg_volume_20"]),
+                    "momentum_20": row.momentum_20,
+                    "momentum_60": row.momentum_60,
+                    "volatility_20": row.volatility_20,
+                    "avg_volume_20": row.avg_volume_20,
                 },
                 "reason": reason,
                 "reason_struct": reason_struct,
@@ -195,7 +280,7 @@ def build_report(
         )
 
     return {
-        "as_of": as_of.strftime("%Y-%m-%d"),
+        "as_of": as_of_str,
         "top_n": top_n,
         "count": len(rows),
         "results": rows,
@@ -1,16 +1,18 @@
 import argparse
+import hashlib
 import json
 import os
 import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 
 from .cache import load_cached, save_cached
 from .candidates import write_candidates
 from .data_provider import StockInfo, build_provider, provider_seed
-from .report import build_report
+from .report import build_report, merge_hit_map, top_rows
 from .scoring import compute_indicators
 from .signals import Signal, load_signals, load_theme_industry_map
 from .theme_pipeline import (
@@ -23,8 +25,24 @@ from .utils import parse_date, previous_trading_date, stable_hash
 
 
 def read_text_hash(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        return stable_hash([f.read()])
+    """Equal to stable_hash([text]) of the file read with universal newlines, but streamed.
+
+    The bytes are hashed in 64 KiB chunks with CRLF/CR folded to LF, so the digest (and the
+    provider seed derived from it) stays the same for CRLF checkouts.
+    """
+    digest = hashlib.md5()
+    carry = b""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            chunk = carry + chunk
+            # A trailing CR may be the first half of a CRLF split across chunks.
+            carry = b"\r" if chunk.endswith(b"\r") else b""
+            if carry:
+                chunk = chunk[:-1]
+            digest.update(chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n"))
+    if carry:
+        digest.update(b"\n")
+    return digest.hexdigest()
 
 
 def normalize_ticker(x) -> str:
@@ -32,12 +50,49 @@ def normalize_ticker(x) -> str:
     return s.zfill(6) if s.isdigit() else s
 
 
-def write_outputs(report: dict, output_prefix: Path) -> None:
-    output_prefix.parent.mkdir(exist_ok=True)
-    with output_prefix.with_suffix(".json").open("w", encoding="utf-8") as f:
+@lru_cache(maxsize=4)
+def load_snapshot_membership(
+    path: str, mtime_ns: int
+) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """Load snapshot membership and the sorted concept/industry terms per ticker.
+
+    Cached on (path, mtime_ns) so in-process callers that run several dates against
+    one snapshot (the backtest specpacks) parse it once. Callers must not mutate the
+    returned objects.
+    """
+    membership_raw = pd.read_csv(path, dtype={"ticker": str})
+    membership_raw["ticker"] = membership_raw["ticker"].map(normalize_ticker)
+    for col in ("concept", "industry", "description", "name"):
+        if col not in membership_raw.columns:
+            membership_raw[col] = ""
+        membership_raw[col] = membership_raw[col].astype(str).str.strip()
+
+    membership_terms_by_ticker = {}
+    for ticker, group in membership_raw.groupby("ticker"):
+        terms = set()
+        for col in ("concept", "industry"):
+            if col not in group.columns:
+                continue
+            for value in group[col].dropna().astype(str):
+                term = value.strip()
+                if not term or term.lower() == "nan":
+                    continue
+                if term in {"对应行业/概念", "关键词", "主题名称"}:
+                    continue
+                terms.add(term)
+        membership_terms_by_ticker[ticker] = sorted(terms)
+    return membership_raw, membership_terms_by_ticker
+
+
+def write_outputs(report: dict, output_prefix: Path, write_csv: bool = True) -> None:
+    output_prefix.parent.mkdir(parents=True, exist_ok=True)
+    json_path = output_prefix.with_suffix(".json")
+    # stdlib json keeps the report bytes independent of which optional packages are installed.
+    with json_path.open("w", encoding="utf-8") as f:
         json.dump(report, f, ensure_ascii=False, indent=2)
-    df = pd.json_normalize(report["results"])
-    df.to_csv(output_prefix.with_suffix(".csv"), index=False)
+    if write_csv:
+        df = pd.json_normalize(report["results"])
+        df.to_csv(output_prefix.with_suffix(".csv"), index=False)
 
 
 def _mode_label(theme_weight: float) -> str:
@@ -216,7 +271,7 @@ def compute_issue_lists(
     return fatal, warn_list
 
 
-def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Pre-holiday A-share stock screener")
     parser.add_argument("--date", required=True, help="As-of date YYYY-MM-DD")
     parser.add_argument("--top", type=int, default=20, help="Top N results")
@@ -236,7 +291,13 @@ def main() -> None:
         default=1.0,
         help="Theme weight multiplier (0 disables theme boost)",
     )
-    args = parser.parse_args()
+    parser.add_argument("--output-dir", default="outputs", help="Directory for report JSON/CSV")
+    parser.add_argument("--no-csv", action="store_true", help="Skip the flattened report CSV")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
 
     as_of = None
     snapshot_as_of = None
@@ -340,27 +401,9 @@ def main() -> None:
                 raise FileNotFoundError(
                     f"Missing concept_membership.csv under {snapshot_dir}. Available snapshots: {available}"
                 )
-            membership_raw = pd.read_csv(membership_path, dtype={"ticker": str})
-            membership_raw["ticker"] = membership_raw["ticker"].map(normalize_ticker)
-            for col in ("concept", "industry", "description", "name"):
-                if col not in membership_raw.columns:
-                    membership_raw[col] = ""
-                membership_raw[col] = membership_raw[col].astype(str).str.strip()
-
-            membership_terms_by_ticker = {}
-            for ticker, group in membership_raw.groupby("ticker"):
-                terms = set()
-                for col in ("concept", "industry"):
-                    if col not in group.columns:
-                        continue
-                    for value in group[col].dropna().astype(str):
-                        term = value.strip()
-                        if not term or term.lower() == "nan":
-                            continue
-                        if term in {"对应行业/概念", "关键词", "主题名称"}:
-                            continue
-                        terms.add(term)
-                membership_terms_by_ticker[ticker] = sorted(terms)
+            membership_raw, membership_terms_by_ticker = load_snapshot_membership(
+                str(membership_path), membership_path.stat().st_mtime_ns
+            )
 
             candidates, debug, candidate_source, membership = build_snapshot_candidates(
                 mapped_theme_map,
@@ -398,6 +441,9 @@ def main() -> None:
             stocks = provider.get_stock_universe(industries)
         seed = provider_seed(args.date, signals_hash)
         price_df = provider.get_price_history(stocks, as_of, lookback_days=130, seed=seed)
+        if not price_df.empty:
+            # Integer-coded tickers speed up the history filter and the groupbys in scoring.
+            price_df["ticker"] = price_df["ticker"].astype("category")
         if price_df.empty:
             n_prices_unique_tickers = 0
             data_date_max = None
@@ -422,7 +468,9 @@ def main() -> None:
             )
             n_candidates_intersection = int(len(membership_tickers & price_tickers))
 
-        history_counts = price_df[price_df["date"] <= as_of].groupby("ticker").size()
+        # Count history per ticker from the ticker column alone instead of copying the frame.
+        history_counts = price_df.loc[price_df["date"] <= as_of, "ticker"].value_counts(sort=False)
+        history_counts = history_counts[history_counts > 0]  # drop unobserved categories
         min_history = 61
         valid_tickers = history_counts[history_counts >= min_history].index
         insufficient_history_60 = int((history_counts < 61).sum())
@@ -456,15 +504,14 @@ def main() -> None:
                 scored_df["final_score"] = scored_df["technical_score"]
             snapshot_id = args.snapshot_as_of or as_of.strftime("%Y-%m-%d")
             _log_candidate_field_coverage(scored_df, snapshot_id)
-            primary = scored_df.sort_values("final_score", ascending=False)
-            selected = primary.head(args.top)
+            selected = top_rows(scored_df, args.top, "final_score")
             if len(selected) < args.top and len(scored_df) >= args.top:
                 remaining = scored_df[~scored_df["ticker"].isin(selected["ticker"])]
-                fallback = remaining.sort_values("technical_score", ascending=False).head(
-                    args.top - len(selected)
-                )
+                fallback = top_rows(remaining, args.top - len(selected), "technical_score")
                 selected = pd.concat([selected, fallback], ignore_index=True)
                 fallback_used = True
+            # Both reports read the same hits; merge them once for the two builds.
+            merged_hits = merge_hit_map(hit_map)
             report = build_report(
                 selected,
                 signals,
@@ -474,6 +521,7 @@ def main() -> None:
                 themes_used=core_themes,
                 provider=args.provider,
                 snapshot_as_of=args.snapshot_as_of,
+                merged_hits=merged_hits,
             )
             candidates_report = build_report(
                 scored_df,
@@ -484,6 +532,7 @@ def main() -> None:
                 themes_used=core_themes,
                 provider=args.provider,
                 snapshot_as_of=args.snapshot_as_of,
+                merged_hits=merged_hits,
             )
             report["data_date"] = as_of.strftime("%Y-%m-%d")
             candidates_report["data_date"] = as_of.strftime("%Y-%m-%d")
@@ -642,8 +691,8 @@ def main() -> None:
     if isinstance(report.get("provenance", {}).get("args", {}), dict):
         debug_data["theme_map_path"] = report["provenance"]["args"].get("theme_map")
     report["debug"] = debug_data
-    output_prefix = Path("outputs") / f"report_{as_of.strftime('%Y-%m-%d')}_top{args.top}"
-    write_outputs(report, output_prefix)
+    output_prefix = Path(args.output_dir) / f"report_{as_of.strftime('%Y-%m-%d')}_top{args.top}"
+    write_outputs(report, output_prefix, write_csv=not args.no_csv)
 
     print(f"As-of date: {report['as_of']}")
     print(f"Top N: {report['top_n']}")
@@ -0,0 +1,109 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import (
+    build_close_matrix,
+    compute_momentum60,
+    forward_return,
+    load_cached_report,
+    report_cache_key,
+    report_stamp,
+)
+from src.run import build_parser
+
+
+def _gapped_prices():
+    dates = pd.bdate_range("2025-09-01", periods=80)
+    rng = np.random.default_rng(7)
+    frames = []
+    for ticker, keep in (
+        ("A0001", np.ones(80, dtype=bool)),
+        # Gaps before and after the momentum anchor, so date and row shifts disagree.
+        ("A0002", ~np.isin(np.arange(80), [10, 11, 12, 65, 72])),
+        # Starts late: only has enough rows for momentum at the very end.
+        ("A0003", np.arange(80) >= 15),
+    ):
+        close = 10.0 + rng.random(80).cumsum()
+        frames.append(pd.DataFrame({"date": dates[keep], "ticker": ticker, "close": close[keep]}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _momentum_by_groupby(prices, date):
+    df = prices[prices["date"] <= date].sort_values(["ticker", "date"])
+    df = df.assign(momentum_60=df.groupby("ticker")["close"].pct_change(59))
+    latest = df[df["date"] == date].dropna(subset=["momentum_60"])
+    return latest.set_index("ticker")["momentum_60"]
+
+
+def _forward_by_groupby(prices, date, tickers, horizon):
+    df = prices[prices["ticker"].isin(tickers)].sort_values(["ticker", "date"])
+    df = df.assign(future_close=df.groupby("ticker")["close"].shift(-horizon))
+    current = df[df["date"] == date].dropna(subset=["future_close"])
+    if current.empty:
+        return 0.0
+    return float(((current["future_close"] - current["close"]) / current["close"]).mean())
+
+
+def test_shifts_follow_each_tickers_own_rows():
+    prices = _gapped_prices()
+    matrix = build_close_matrix(prices)
+    tickers = ["A0001", "A0002", "A0003"]
+    for date in sorted(prices["date"].unique())[55:]:
+        got = compute_momentum60(matrix, date).set_index("ticker")["momentum_60"]
+        expected = _momentum_by_groupby(prices, date)
+        pd.testing.assert_series_equal(got, expected, check_names=False, check_index_type=False)
+        for horizon in (1, 5):
+            assert forward_return(matrix, date, tickers, horizon) == pytest.approx(
+                _forward_by_groupby(prices, date, tickers, horizon)
+            )
+
+
+def test_duplicate_rows_are_rejected():
+    prices = _gapped_prices()
+    with pytest.raises(ValueError, match="duplicate"):
+        build_close_matrix(pd.concat([prices, prices.iloc[[3]]], ignore_index=True))
+
+
+def test_cached_report_hit_and_miss(tmp_path):
+    output_path = tmp_path / "report_2026-01-20_top2.json"
+    key_path = output_path.with_suffix(".cachekey")
+    raw = json.dumps({"results": [{"ticker": "A0001"}, {"ticker": "A0002"}]}).encode("utf-8")
+    output_path.write_bytes(raw)
+    assert load_cached_report(output_path, key_path, "k1", 2) is None
+
+    key_path.write_text(report_stamp("k1", raw), encoding="utf-8")
+    assert load_cached_report(output_path, key_path, "k1", 2)["results"][1]["ticker"] == "A0002"
+    assert load_cached_report(output_path, key_path, "k2", 2) is None
+    assert load_cached_report(output_path, key_path, "k1", 3) is None
+
+    # Another run rewrote the report without refreshing the sidecar.
+    output_path.write_bytes(raw.replace(b"A0002", b"A0003"))
+    assert load_cached_report(output_path, key_path, "k1", 2) is None
+
+
+def test_report_cache_key_tracks_inputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    defaults = build_parser().parse_args(["--date", "2026-01-20"])
+    Path(defaults.signals).write_text("signals: []\n", encoding="utf-8")
+    theme_map = Path(defaults.theme_map)
+    theme_map.write_text("核心主题,概念\nAI,算力\n", encoding="utf-8")
+    snapshot_dir = tmp_path / "data" / "snapshots" / "2026-01-20"
+    snapshot_dir.mkdir(parents=True)
+    (snapshot_dir / "prices.csv").write_text("date,ticker,close\n", encoding="utf-8")
+
+    tokens = ["python3", "-m", "src.run", "--date", "2026-01-20", "--top", "5"]
+    key = report_cache_key(tokens, "abc", "2026-01-20")
+    assert report_cache_key(tokens, "abc", "2026-01-20") == key
+    assert report_cache_key(tokens, "def", "2026-01-20") != key
+
+    # The default theme map is read even though the tokens do not name it.
+    theme_map.write_text("核心主题,概念\nAI,光模块\n", encoding="utf-8")
+    changed = report_cache_key(tokens, "abc", "2026-01-20")
+    assert changed != key
+
+    (snapshot_dir / "prices.csv").write_text("date,ticker,close\n2026-01-20,A0001,1\n")
+    assert report_cache_key(tokens, "abc", "2026-01-20") != changed
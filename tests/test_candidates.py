@@ -0,0 +1,53 @@
+import json
+
+from src.candidates import _candidate_entry, load_candidates, write_candidates
+
+MODE_ORDER = {"enhanced": 0, "tech_only": 1, "all": 2}
+
+
+def _sort_and_dedup(existing, new_entries, mode):
+    # The implementation write_candidates replaced: drop the mode, append, full sort.
+    merged = [entry for entry in existing if entry.get("mode") != mode]
+    merged.extend(new_entries)
+
+    def sort_key(entry):
+        mode_value = MODE_ORDER.get(entry.get("mode"), 9)
+        try:
+            score_value = float(entry.get("final_score"))
+        except (TypeError, ValueError):
+            score_value = float("-inf")
+        item_id = str(entry.get("item_id") or entry.get("ticker") or "")
+        return (mode_value, -score_value, item_id)
+
+    return sorted(merged, key=sort_key)
+
+
+def _report(*rows):
+    return {"results": [{"ticker": ticker, "final_score": score} for ticker, score in rows]}
+
+
+def test_merge_matches_sort_and_dedup(tmp_path):
+    path = tmp_path / "candidates.jsonl"
+    # Unsorted file written elsewhere, with an unknown mode, ties and missing scores.
+    existing = [
+        {"item_id": "C", "ticker": "C", "mode": "all", "final_score": 1.0},
+        {"item_id": "B", "ticker": "B", "mode": "tech_only", "final_score": 2.0},
+        {"item_id": "X", "ticker": "X", "mode": "legacy", "final_score": 9.0},
+        {"item_id": "A", "ticker": "A", "mode": "tech_only", "final_score": 2.0},
+        {"item_id": "D", "ticker": "D", "mode": "enhanced", "final_score": None},
+        {"item_id": "E", "ticker": "E", "mode": "all", "final_score": "n/a"},
+    ]
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in existing), encoding="utf-8")
+
+    writes = [
+        ("enhanced", _report(("B", 3.0), ("A", 3.0), ("Z", None), ("C", 5.5))),
+        ("tech_only", _report(("Q", 1.0), ("P", 4.0))),
+        ("all", _report(("A", 2.0), ("A", 2.0), ("M", "bad"))),
+        ("enhanced", _report(("K", 0.5))),
+        ("tech_only", _report()),
+    ]
+    for mode, report in writes:
+        before = load_candidates(path)
+        write_candidates(report, mode, path, "snap")
+        new_entries = [_candidate_entry(row, mode, "snap") for row in report["results"]]
+        assert load_candidates(path) == _sort_and_dedup(before, new_entries, mode)
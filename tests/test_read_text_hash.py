@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pytest
+
+from src.run import read_text_hash
+from src.utils import stable_hash
+
+CHUNK = 65536
+
+
+def _old_hash(path):
+    return stable_hash([Path(path).read_text(encoding="utf-8")])
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        "主题,概念\nAI,算力\n".encode("utf-8"),
+        "主题,概念\r\nAI,算力\r\n".encode("utf-8"),
+        b"a\rb\r\nc\n\r",
+        # CRLF split across the chunk boundary.
+        b"x" * (CHUNK - 1) + b"\r\n" + b"tail\r\n",
+        # Lone CR as the last byte of a chunk, then LF-only text.
+        b"x" * (CHUNK - 1) + b"\r" + b"y\n",
+        # CR ending the first chunk and starting the second.
+        b"x" * (CHUNK - 1) + b"\r\r\n" + b"z",
+        # File ends on a CR exactly at the boundary.
+        b"x" * (CHUNK - 1) + b"\r",
+        b"\r\n".join([b"row"] * 40000),
+    ],
+)
+def test_read_text_hash_matches_universal_newline_read(tmp_path, data):
+    path = tmp_path / "theme_map.csv"
+    path.write_bytes(data)
+    assert read_text_hash(str(path)) == _old_hash(path)
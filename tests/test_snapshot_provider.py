@@ -1,4 +1,8 @@
-from src.data_provider import SnapshotProvider
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_provider import SnapshotProvider, _normalize_tickers, normalize_ticker
 from src.report import build_report
 from src.scoring import compute_indicators, score_stocks
 from src.signals import load_signals, load_theme_industry_map
@@ -64,3 +68,23 @@ def test_snapshot_no_nan_and_theme_unique():
         assert indicators.get("momentum_60") == indicators.get("momentum_60")
         themes = [hit.get("theme") for hit in row.get("theme_hits", []) if hit.get("theme")]
         assert len(themes) == len(set(themes))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["1", "600519", "300750", "0000001"],
+        [" 1", "2 ", "\t000001\n", "  "],
+        ["000001.SZ", "600519.SH", "SH600519", "sz000001", "1.0"],
+        ["AAPL", "", "１２３", "٣"],
+        [1, 600519, 300750],
+        [1.0, None, np.nan, "nan"],
+        [],
+    ],
+)
+def test_normalize_tickers_matches_per_element(values):
+    series = pd.Series(values, dtype=object)
+    expected = series.map(normalize_ticker)
+    got = _normalize_tickers(series)
+    assert got.tolist() == expected.tolist()
+    assert _normalize_tickers(pd.Series(values)).tolist() == expected.tolist()